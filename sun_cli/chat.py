@@ -42,6 +42,10 @@ def _get_logger():
         _cached_logger = get_logger(__name__)
     return _cached_logger
 
+# Cleanup applied to every assistant reply once tool calls are stripped
+_EMPTY_FENCE_RE = re.compile(r"```(?:json)?\s*```", re.IGNORECASE | re.DOTALL)
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
 # s04: Subagent
 from .subagent import run_subagent
 
@@ -908,12 +912,11 @@ class ChatSession:
         if not content:
             return content
 
-        cleaned = ToolCallParser.XML_PATTERN.sub("", content)
-        cleaned = ToolCallParser.JSON_PATTERN.sub("", cleaned)
+        cleaned = ToolCallParser.TOOL_CALL_PATTERN.sub("", content)
 
         # Remove empty code fences left after stripping tool JSON snippets.
-        cleaned = re.sub(r"```(?:json)?\s*```", "", cleaned, flags=re.IGNORECASE | re.DOTALL)
-        cleaned = re.sub(r"\n{3,}", "\n\n", cleaned)
+        cleaned = _EMPTY_FENCE_RE.sub("", cleaned)
+        cleaned = _BLANK_LINES_RE.sub("\n\n", cleaned)
         return cleaned.strip()
 
     async def _check_scheduled_tasks(self):
@@ -1077,78 +1080,91 @@ class ChatSession:
         )
     
     async def _execute_tool_calls(self, tool_calls: list[ToolCall]) -> list[str]:
-        """Execute tool calls with deduplication and compact progress UI."""
-        results = []
-        executed = {}
+        """Execute tool calls with deduplication and compact progress UI.
+        
+        Distinct calls go through ``ToolExecutor.execute_all``, so
+        consecutive reads run concurrently; repeated calls reuse the result.
+        """
+        unique_calls: list[ToolCall] = []
+        slots: list[int] = []  # index into unique_calls for each call
+        first_seen: dict[tuple, int] = {}
         progress_items: list[dict[str, str]] = []
+        # Progress items waiting on each unique call (itself first, then its duplicates)
+        waiting: list[list[dict[str, str]]] = []
         spinner_frames = ["⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧", "⠇", "⠏"]
         show_spinner_ui = not self._is_debug_mode()
 
+        for call in tool_calls:
+            # Deduplication key
+            args_key = json.dumps(call.args, sort_keys=True, ensure_ascii=False)
+            cache_key = (call.name, args_key)
+            item = {"status": "running", "text": self._format_tool_call_label(call)}
+            progress_items.append(item)
+
+            slot = first_seen.get(cache_key)
+            if slot is not None:
+                _get_logger().debug(f"工具调用缓存命中: {call.name} - {call.args}")
+                item["text"] = f"{item['text']} (cached)"
+                waiting[slot].append(item)
+            else:
+                slot = first_seen[cache_key] = len(unique_calls)
+                unique_calls.append(call)
+                waiting.append([item])
+            slots.append(slot)
+
+        running: list[int] = []
+
+        def on_start(index: int) -> None:
+            call = unique_calls[index]
+            _get_logger().debug(f"开始执行工具: {call.name}")
+            _get_logger().debug(f"工具参数: {call.args}")
+            running.append(index)
+
+        def on_done(index: int, result: str) -> None:
+            call = unique_calls[index]
+            _get_logger().debug(f"工具执行完成: {call.name}")
+            _get_logger().debug(f"工具执行结果: {result[:100]}...")
+            running.remove(index)
+
+            item, *duplicates = waiting[index]
+            if result.strip().lower().startswith("error"):
+                _get_logger().warning(f"工具执行错误: {result}")
+                item["status"] = "error"
+                item["text"] = f"{item['text']} - {self._short_error(result)}"
+            else:
+                item["status"] = "success"
+            for duplicate in duplicates:
+                duplicate["status"] = "success"
+
         live_ctx = (
             Live(self._render_tool_progress(progress_items), console=self.console, refresh_per_second=12)
             if show_spinner_ui
             else nullcontext(None)
         )
         with live_ctx as live:
-            for call in tool_calls:
-                # Deduplication key
-                args_key = json.dumps(call.args, sort_keys=True, ensure_ascii=False)
-                cache_key = (call.name, args_key)
-
-                if cache_key in executed:
-                    _get_logger().debug(f"工具调用缓存命中: {call.name} - {call.args}")
-                    progress_items.append({
-                        "status": "success",
-                        "text": f"{self._format_tool_call_label(call)} (cached)",
-                    })
-                    results.append(executed[cache_key])
-                    if show_spinner_ui and live is not None:
-                        live.update(self._render_tool_progress(progress_items))
-                    continue
-
-                _get_logger().debug(f"开始执行工具: {call.name}")
-                _get_logger().debug(f"工具参数: {call.args}")
-                
-                item = {
-                    "status": "running",
-                    "text": self._format_tool_call_label(call),
-                }
-                progress_items.append(item)
-                if show_spinner_ui and live is not None:
-                    live.update(self._render_tool_progress(progress_items, spinner_frames[0]))
-
-                exec_task = asyncio.create_task(self.tool_executor.execute(call))
-                spin_index = 0
-                current_action = self._format_tool_call_action(call)
-                start_time = time.monotonic()
-                if show_spinner_ui and live is not None:
-                    while not exec_task.done():
-                        live.update(self._render_tool_progress(progress_items, spinner_frames[spin_index % len(spinner_frames)], current_action))
-                        spin_index += 1
-                        await asyncio.sleep(0.08)
-
-                result = await exec_task
-                if show_spinner_ui:
-                    # Ensure spinner is visible for at least 300ms so user can see it
-                    elapsed = time.monotonic() - start_time
-                    if elapsed < 0.3:
-                        await asyncio.sleep(0.3 - elapsed)
-                _get_logger().debug(f"工具执行完成: {call.name}")
-                _get_logger().debug(f"工具执行结果: {result[:100]}...")
-                
-                executed[cache_key] = result
-                results.append(result)
-
-                if result.strip().lower().startswith("error"):
-                    _get_logger().warning(f"工具执行错误: {result}")
-                    item["status"] = "error"
-                    item["text"] = f"{item['text']} - {self._short_error(result)}"
-                else:
-                    item["status"] = "success"
-
-                if show_spinner_ui and live is not None:
-                    live.update(self._render_tool_progress(progress_items))
-
+            exec_task = asyncio.create_task(
+                self.tool_executor.execute_all(unique_calls, on_start=on_start, on_done=on_done)
+            )
+            spin_index = 0
+            start_time = time.monotonic()
+            if show_spinner_ui and live is not None:
+                while not exec_task.done():
+                    current_action = self._format_tool_call_action(unique_calls[running[-1]]) if running else None
+                    live.update(self._render_tool_progress(progress_items, spinner_frames[spin_index % len(spinner_frames)], current_action))
+                    spin_index += 1
+                    await asyncio.sleep(0.08)
+
+            unique_results = await exec_task
+            if show_spinner_ui:
+                # Ensure spinner is visible for at least 300ms so user can see it
+                elapsed = time.monotonic() - start_time
+                if elapsed < 0.3:
+                    await asyncio.sleep(0.3 - elapsed)
+
+            if show_spinner_ui and live is not None:
+                live.update(self._render_tool_progress(progress_items))
+
+        results = [unique_results[slot] for slot in slots]
         _get_logger().debug(f"所有工具调用执行完成，共 {len(results)} 个结果")
         return results
 
@@ -15,7 +15,8 @@ from rich.text import Text
 from . import __app_name__, __version__
 from .chat import ChatSession
 from .config import get_config, get_config_dir, update_config
-from .shell import execute_shell_command, is_shell_command, extract_command
+from .shell import execute_shell_command, parse_shell_command
+from .utils.http import aclose_llm_client
 from .prompts import get_prompt_manager
 from .skills import get_skill_manager, SkillContext
 from .models_presets import (
@@ -744,8 +745,6 @@ def config(
 
 def _interactive_model_setup() -> None:
     """Interactive model selection and API key configuration."""
-    from .models_presets import MODEL_PRESETS
-
     providers = get_provider_names()
 
     # Step 1: Show all providers
@@ -772,7 +771,7 @@ def _interactive_model_setup() -> None:
             console.print("[red]请输入数字编号[/red]")
 
     # Step 2: Show models for selected provider
-    provider_presets = MODEL_PRESETS.get(selected_provider, [])
+    provider_presets = get_presets_by_provider(selected_provider)
     if not provider_presets:
         console.print(f"[red]提供商 '{selected_provider}' 没有可用模型[/red]")
         return
@@ -1164,10 +1163,10 @@ async def _chat_async() -> None:
                     break
                 
                 # Handle shell commands (start with !)
-                if is_shell_command(user_input):
-                    shell_cmd = extract_command(user_input)
+                shell_cmd = parse_shell_command(user_input)
+                if shell_cmd is not None:
                     console.print(f"[dim]$ {shell_cmd}[/dim]")
-                    execute_shell_command(shell_cmd, console)
+                    await execute_shell_command(shell_cmd, console)
                     continue
 
                 # Handle plan mode input states
@@ -1330,6 +1329,8 @@ async def _chat_async() -> None:
                 await s.close()
             except Exception:
                 pass
+        # Shared commit-message client; must close while the loop is alive
+        await aclose_llm_client()
 
 
 async def _handle_message(session: ChatSession, message: str) -> None:
@@ -14,6 +14,10 @@ from .git_helper import GitHelper, ConflictInfo
 from .config import get_config
 
 
+# Shared Syntax options for conflict snippets
+_SNIPPET_SYNTAX_KWARGS = dict(theme="monokai", line_numbers=True)
+
+
 class ConflictResolver:
     """Interactive UI for resolving merge conflicts."""
     
@@ -113,11 +117,11 @@ class ConflictResolver:
         """Display conflict details."""
         # Show OURS (HEAD)
         self.console.print("\n[bold green]选项 1: 保留当前分支 (HEAD/ours)[/bold green]")
-        self._show_code_snippet(conflict.ours_content, "green")
+        self._show_code_snippet(conflict.ours_content, "green", conflict.file)
         
         # Show THEIRS
         self.console.print("\n[bold blue]选项 2: 保留远程分支 (incoming/theirs)[/bold blue]")
-        self._show_code_snippet(conflict.theirs_content, "blue")
+        self._show_code_snippet(conflict.theirs_content, "blue", conflict.file)
         
         # Show options
         self.console.print("\n[bold]选项:[/bold]")
@@ -128,7 +132,7 @@ class ConflictResolver:
         self.console.print("  [dim]s[/dim] - 跳过此文件")
         self.console.print("  [red]a[/red] - 中止 rebase")
     
-    def _show_code_snippet(self, content: str, style: str):
+    def _show_code_snippet(self, content: str, style: str, file_path: str = ""):
         """Show a code snippet with syntax highlighting."""
         # Limit display length
         max_lines = 20
@@ -139,10 +143,11 @@ class ConflictResolver:
         else:
             display = content
         
-        # Try to detect language
-        lang = "python" if ".py" in display else "text"
+        # Detect language from the file name rather than scanning the snippet;
+        # plain text uses Pygments' trivial TextLexer
+        lang = "python" if file_path.endswith(".py") else "text"
         
-        syntax = Syntax(display, lang, theme="monokai", line_numbers=True)
+        syntax = Syntax(display, lang, **_SNIPPET_SYNTAX_KWARGS)
         self.console.print(Panel(syntax, border_style=style))
     
     def _extract_ours(self, file_path: str) -> str:
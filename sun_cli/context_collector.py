@@ -4,44 +4,127 @@ This module provides intelligent project context gathering, similar to Codex's
 AGENTS.md approach. It prioritizes reading AGENTS.md files over automatic project scanning.
 """
 
+import fnmatch
+import io
 import os
 import re
+import threading
 from pathlib import Path
-from dataclasses import dataclass, field
+from functools import cached_property
 from typing import Optional, List, Dict, Any
 from rich.console import Console
 from rich.tree import Tree
 from rich.panel import Panel
 
+from .git_helper import find_repo_root
+
 
-@dataclass
 class ProjectContext:
-    """Collected project context."""
-    project_type: str = "unknown"
-    project_name: str = ""
-    root_path: Path = field(default_factory=Path)
-    key_files: Dict[str, str] = field(default_factory=dict)
-    directory_tree: str = ""
-    python_modules: List[str] = field(default_factory=list)
-    recent_changes: List[str] = field(default_factory=list)
-    git_info: Dict[str, Any] = field(default_factory=dict)
-    summary: str = ""
-    agents_md_content: str = ""  # AGENTS.md content if found
-    agents_md_found: bool = False  # Whether AGENTS.md was found
+    """Collected project context.
+    
+    The expensive scan results (directory tree, Python modules, recent
+    commits and the summary built from them) are computed on first access
+    by the collector that produced this context, so callers that only need
+    the cheap fields never pay for the filesystem walk.
+    """
+    
+    def __init__(
+        self,
+        project_type: str = "unknown",
+        project_name: str = "",
+        root_path: Optional[Path] = None,
+        key_files: Optional[Dict[str, str]] = None,
+        git_info: Optional[Dict[str, Any]] = None,
+        agents_md_content: str = "",  # AGENTS.md content if found
+        agents_md_found: bool = False,  # Whether AGENTS.md was found
+        collector: Optional["ContextCollector"] = None,
+    ):
+        self.project_type = project_type
+        self.project_name = project_name
+        self.root_path = root_path if root_path is not None else Path()
+        self.key_files = key_files if key_files is not None else {}
+        self.git_info = git_info if git_info is not None else {}
+        self.agents_md_content = agents_md_content
+        self.agents_md_found = agents_md_found
+        self._collector = collector
+    
+    @cached_property
+    def directory_tree(self) -> str:
+        if self._collector is None:
+            return ""
+        return self._collector._build_directory_tree(self.root_path)
+    
+    @cached_property
+    def python_modules(self) -> List[str]:
+        if self._collector is None or self.project_type != "python":
+            return []
+        return self._collector._find_python_modules(self.root_path)
+    
+    @cached_property
+    def recent_changes(self) -> List[str]:
+        if self._collector is None:
+            return []
+        return self._collector._get_recent_changes(self.root_path)
+    
+    @cached_property
+    def summary(self) -> str:
+        if self._collector is None:
+            return ""
+        return self._collector._generate_summary(self)
+
+
+# Project type detection patterns, in priority order
+_PROJECT_PATTERNS = {
+    "python": ["pyproject.toml", "setup.py", "setup.cfg", "requirements.txt", "Pipfile"],
+    "nodejs": ["package.json", "package-lock.json", "yarn.lock", "pnpm-lock.yaml"],
+    "rust": ["Cargo.toml", "Cargo.lock"],
+    "go": ["go.mod", "go.sum"],
+    "java": ["pom.xml", "build.gradle", "build.gradle.kts"],
+    "ruby": ["Gemfile", "*.gemspec"],
+}
+
+
+def _build_type_index() -> tuple[Dict[str, tuple[int, str]], List[tuple[int, str, str]]]:
+    """Split detection patterns into a literal name index and glob suffixes.
+    
+    Returns:
+        Tuple of (name -> (priority, type), [(priority, suffix, type)])
+    """
+    name_to_type: Dict[str, tuple[int, str]] = {}
+    glob_types: List[tuple[int, str, str]] = []
+    for priority, (project_type, patterns) in enumerate(_PROJECT_PATTERNS.items()):
+        for pattern in patterns:
+            if pattern.startswith("*"):
+                glob_types.append((priority, pattern[1:], project_type))
+            else:
+                name_to_type.setdefault(pattern, (priority, project_type))
+    return name_to_type, glob_types
+
+
+_NAME_TO_TYPE, _GLOB_TYPES = _build_type_index()
+
+
+# Directory tree entries to skip: exact names and glob patterns
+_IGNORE_NAMES = frozenset({".git", "__pycache__", ".pytest_cache", "node_modules", ".venv", "venv"})
+_IGNORE_GLOBS = ("*.pyc",)
+
+# "name" field of package.json (top-level name comes first by convention)
+_PACKAGE_NAME_RE = re.compile(r'"name"\s*:\s*"([^"]+)"')
+
+
+def _git_env() -> Dict[str, str]:
+    """Environment for read-only git calls (no optional locks, C locale)."""
+    env = os.environ.copy()
+    env["GIT_OPTIONAL_LOCKS"] = "0"
+    env["LC_ALL"] = "C"
+    return env
 
 
 class ContextCollector:
     """Collects and manages project context."""
     
     # Project type detection patterns
-    PROJECT_PATTERNS = {
-        "python": ["pyproject.toml", "setup.py", "setup.cfg", "requirements.txt", "Pipfile"],
-        "nodejs": ["package.json", "package-lock.json", "yarn.lock", "pnpm-lock.yaml"],
-        "rust": ["Cargo.toml", "Cargo.lock"],
-        "go": ["go.mod", "go.sum"],
-        "java": ["pom.xml", "build.gradle", "build.gradle.kts"],
-        "ruby": ["Gemfile", "*.gemspec"],
-    }
+    PROJECT_PATTERNS = _PROJECT_PATTERNS
     
     # AGENTS.md file names to look for (in order of priority)
     AGENTS_MD_FILES = ["AGENTS.md", ".kimi/AGENTS.md", ".agents.md"]
@@ -119,7 +202,11 @@ class ContextCollector:
             self._cache_timestamp = time.time()
             return context
         
-        # No AGENTS.md found - fall back to automatic project scanning
+        # No AGENTS.md found - fall back to automatic project scanning.
+        # Directory tree, Python modules, recent changes and summary are
+        # computed lazily by the context on first access.
+        context._collector = self
+        
         # Detect project type
         context.project_type = self._detect_project_type(root)
         
@@ -129,22 +216,9 @@ class ContextCollector:
         # Get project name from key files
         context.project_name = self._extract_project_name(context)
         
-        # Build directory tree
-        context.directory_tree = self._build_directory_tree(root)
-        
-        # Find Python modules (if applicable)
-        if context.project_type == "python":
-            context.python_modules = self._find_python_modules(root)
-        
         # Get git info
         context.git_info = self._get_git_info(root)
         
-        # Get recent changes
-        context.recent_changes = self._get_recent_changes(root)
-        
-        # Generate summary
-        context.summary = self._generate_summary(context)
-        
         # Cache result
         self._context_cache = context
         import time
@@ -154,18 +228,25 @@ class ContextCollector:
     
     def _detect_project_type(self, root: Path) -> str:
         """Detect project type based on files present."""
-        files = {f.name for f in root.iterdir() if f.is_file()}
-        
-        for project_type, patterns in self.PROJECT_PATTERNS.items():
-            for pattern in patterns:
-                if pattern.startswith("*"):
-                    # Handle glob patterns
-                    if any(f.endswith(pattern[1:]) for f in files):
-                        return project_type
-                elif pattern in files:
-                    return project_type
-        
-        return "unknown"
+        files = [f.name for f in root.iterdir() if f.is_file()]
+        
+        # Single pass over the directory; the lowest priority wins so that
+        # mixed projects resolve the same way regardless of listing order
+        best: Optional[tuple[int, str]] = None
+        for name in files:
+            hit = _NAME_TO_TYPE.get(name)
+            if hit is not None and (best is None or hit < best):
+                best = hit
+        
+        # Glob patterns only matter if they could beat the literal match
+        for priority, suffix, project_type in _GLOB_TYPES:
+            if best is not None and best[0] <= priority:
+                break
+            if any(name.endswith(suffix) for name in files):
+                best = (priority, project_type)
+                break
+        
+        return best[1] if best is not None else "unknown"
     
     def _read_key_files(self, root: Path, project_type: str) -> Dict[str, str]:
         """Read key configuration files."""
@@ -204,9 +285,15 @@ class ContextCollector:
         
         elif context.project_type == "nodejs":
             if "package.json" in context.key_files:
+                content = context.key_files["package.json"]
+                # key_files are truncated, so a targeted search is both cheaper
+                # and more reliable than parsing the whole document
+                match = _PACKAGE_NAME_RE.search(content)
+                if match:
+                    return match.group(1)
                 import json
                 try:
-                    data = json.loads(context.key_files["package.json"])
+                    data = json.loads(content)
                     return data.get("name", "")
                 except Exception:
                     pass
@@ -222,40 +309,45 @@ class ContextCollector:
     
     def _build_directory_tree(self, root: Path, max_depth: int = 3) -> str:
         """Build a simplified directory tree."""
-        lines = [f"📁 {root.name}/"]
+        buf = io.StringIO()
+        buf.write(f"📁 {root.name}/\n")
         
-        def add_tree(path: Path, prefix: str = "", depth: int = 0):
+        def add_tree(path: str, prefix: str = "", depth: int = 0):
             if depth >= max_depth:
                 return
             
             try:
-                entries = sorted(path.iterdir(), key=lambda x: (not x.is_dir(), x.name.lower()))
+                with os.scandir(path) as it:
+                    scanned = [(e, e.is_dir()) for e in it]
             except PermissionError:
                 return
             
             # Filter out common ignore patterns
-            ignore_patterns = {".git", "__pycache__", ".pytest_cache", "node_modules", ".venv", "venv", "*.pyc"}
-            entries = [e for e in entries if not any(
-                e.match(pattern) or e.name == pattern for pattern in ignore_patterns
+            scanned = [(e, d) for e, d in scanned if e.name not in _IGNORE_NAMES and not any(
+                fnmatch.fnmatchcase(e.name, pattern) for pattern in _IGNORE_GLOBS
             )]
             
+            # Directories first, then files, each sorted by name
+            dirs = sorted((item for item in scanned if item[1]), key=lambda item: item[0].name.lower())
+            files = sorted((item for item in scanned if not item[1]), key=lambda item: item[0].name.lower())
+            
             # Limit entries per directory
-            entries = entries[:20]
+            entries = (dirs + files)[:20]
             
-            for i, entry in enumerate(entries):
+            for i, (entry, is_dir) in enumerate(entries):
                 is_last = i == len(entries) - 1
                 connector = "└── " if is_last else "├── "
                 
-                if entry.is_dir():
-                    lines.append(f"{prefix}{connector}📁 {entry.name}/")
+                if is_dir:
+                    buf.write(f"{prefix}{connector}📁 {entry.name}/\n")
                     new_prefix = prefix + ("    " if is_last else "│   ")
-                    add_tree(entry, new_prefix, depth + 1)
+                    add_tree(entry.path, new_prefix, depth + 1)
                 else:
                     icon = self._get_file_icon(entry.name)
-                    lines.append(f"{prefix}{connector}{icon} {entry.name}")
+                    buf.write(f"{prefix}{connector}{icon} {entry.name}\n")
         
-        add_tree(root, "")
-        return "\n".join(lines)
+        add_tree(str(root), "")
+        return buf.getvalue().rstrip("\n")
     
     def _get_file_icon(self, filename: str) -> str:
         """Get appropriate icon for file type."""
@@ -289,42 +381,45 @@ class ContextCollector:
         
         return sorted(set(modules))[:10]  # Limit to 10 modules
     
-    def _get_git_info(self, root: Path) -> Dict[str, Any]:
-        """Get git repository information."""
+    def _run_git(self, root: Path, *args: str) -> Optional[str]:
+        """Run a read-only git command and return decoded stdout.
+        
+        Output is captured as bytes and decoded once. Optional index locks
+        and locale lookups are disabled since we only read.
+        
+        Returns:
+            Stripped stdout, or None if the command failed
+        """
         import subprocess
         
+        result = subprocess.run(
+            ["git", *args],
+            cwd=root,
+            capture_output=True,
+            env=_git_env(),
+        )
+        if result.returncode != 0:
+            return None
+        return result.stdout.decode("utf-8", "replace").strip()
+    
+    def _get_git_info(self, root: Path) -> Dict[str, Any]:
+        """Get git repository information."""
         git_info = {"is_repo": False, "branch": "", "remote": ""}
         
         try:
-            # Check if git repo
-            result = subprocess.run(
-                ["git", "rev-parse", "--git-dir"],
-                cwd=root,
-                capture_output=True,
-                text=True
-            )
-            git_info["is_repo"] = result.returncode == 0
+            # Check if git repo (in-process, no subprocess)
+            git_info["is_repo"] = find_repo_root(str(root)) is not None
             
             if git_info["is_repo"]:
                 # Get current branch
-                result = subprocess.run(
-                    ["git", "branch", "--show-current"],
-                    cwd=root,
-                    capture_output=True,
-                    text=True
-                )
-                if result.returncode == 0:
-                    git_info["branch"] = result.stdout.strip()
+                branch = self._run_git(root, "branch", "--show-current")
+                if branch is not None:
+                    git_info["branch"] = branch
                 
                 # Get remote URL
-                result = subprocess.run(
-                    ["git", "remote", "get-url", "origin"],
-                    cwd=root,
-                    capture_output=True,
-                    text=True
-                )
-                if result.returncode == 0:
-                    git_info["remote"] = result.stdout.strip()
+                remote = self._run_git(root, "remote", "get-url", "origin")
+                if remote is not None:
+                    git_info["remote"] = remote
         
         except Exception:
             pass
@@ -333,21 +428,12 @@ class ContextCollector:
     
     def _get_recent_changes(self, root: Path, count: int = 5) -> List[str]:
         """Get recent git changes."""
-        import subprocess
-        
         changes = []
         
         try:
-            result = subprocess.run(
-                ["git", "log", "--oneline", "-n", str(count)],
-                cwd=root,
-                capture_output=True,
-                text=True,
-                encoding="utf-8",
-                errors="ignore"
-            )
-            if result.returncode == 0:
-                changes = result.stdout.strip().split("\n")
+            output = self._run_git(root, "log", "--oneline", "-n", str(count))
+            if output is not None:
+                changes = output.split("\n")
         except Exception:
             pass
         
@@ -495,14 +581,19 @@ class ContextCollector:
 
 # Global instance
 _context_collector: Optional[ContextCollector] = None
+_context_collector_lock = threading.Lock()
 
 
 def get_context_collector(console: Optional[Console] = None) -> ContextCollector:
     """Get or create global context collector."""
     global _context_collector
-    if _context_collector is None:
-        _context_collector = ContextCollector(console)
-    return _context_collector
+    collector = _context_collector
+    if collector is not None:
+        return collector
+    with _context_collector_lock:
+        if _context_collector is None:
+            _context_collector = ContextCollector(console)
+        return _context_collector
 
 
 def collect_context(root_path: Optional[Path] = None, console: Optional[Console] = None) -> ProjectContext:
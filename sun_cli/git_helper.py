@@ -1,9 +1,13 @@
 """Git helper for Sun CLI - Smart commit workflow."""
 
+import asyncio
+import itertools
+import os
 import subprocess
 import re
+import time
 from pathlib import Path
-from typing import Optional, List, Tuple
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, Optional, List, Tuple, Union
 from dataclasses import dataclass
 
 from rich.console import Console
@@ -45,6 +49,16 @@ class GitStatus:
         return bool(self.staged or self.unstaged or self.untracked)
 
 
+# Branch, ahead/behind and file states in one NUL-separated listing
+_STATUS_CMD = ("git", "status", "--porcelain=v2", "--branch", "-z")
+
+# First conflict hunk: ours, optional diff3 base (|||||||), theirs
+_CONFLICT_RE = re.compile(
+    rb"<<<<<<< [^\n]*\n(.*?)(?:\|\|\|\|\|\|\| [^\n]*\n(.*?))?=======\r?\n(.*?)>>>>>>> ",
+    re.DOTALL
+)
+
+
 @dataclass
 class ConflictInfo:
     """Information about a merge conflict."""
@@ -57,110 +71,251 @@ class ConflictInfo:
 class GitHelper:
     """Helper class for Git operations."""
     
+    # Seconds that read-only results (status, diff, log) stay valid
+    CACHE_TTL = 2.0
+    
+    # Git dir files whose stat identifies the staged tree and HEAD;
+    # logs/HEAD is appended on every commit, checkout, pull and reset
+    STAGED_STAMP_FILES = ("index", "HEAD", "logs/HEAD")
+    HEAD_STAMP_FILES = ("HEAD", "logs/HEAD")
+    
     def __init__(self, console: Console):
         self.console = console
+        self._cache: Dict[tuple, Tuple[float, Any]] = {}
+        self._stamped_cache: Dict[tuple, Tuple[tuple, Any]] = {}
         self.repo_root = self._find_repo_root()
+        self._is_repo = self.repo_root is not None
+        self._git_dir = _resolve_git_dir(self.repo_root) if self._is_repo else None
+    
+    def _cached(self, key: tuple, fn: Callable[[], Any]) -> Any:
+        """Return a cached result for ``key`` or compute it with ``fn``."""
+        now = time.monotonic()
+        hit = self._cache.get(key)
+        if hit is not None and now - hit[0] < self.CACHE_TTL:
+            return hit[1]
+        value = fn()
+        self._cache[key] = (now, value)
+        return value
+    
+    def _stamp(self, names: Tuple[str, ...]) -> Optional[tuple]:
+        """Stat signature of files in the git dir, or None if any is missing."""
+        if self._git_dir is None:
+            return None
+        stamp = []
+        for name in names:
+            try:
+                st = os.stat(self._git_dir / name)
+            except OSError:
+                return None
+            stamp.append((st.st_mtime_ns, st.st_size))
+        return tuple(stamp)
+    
+    def _cached_by_stamp(self, key: tuple, names: Tuple[str, ...], fn: Callable[[], Any]) -> Any:
+        """Like ``_cached``, but valid until the given git dir files change.
+        
+        Lets a re-run (e.g. after rejecting a commit message) skip the git
+        subprocess entirely. Falls back to the TTL cache without a git dir.
+        """
+        stamp = self._stamp(names)
+        if stamp is None:
+            return self._cached(key, fn)
+        hit = self._stamped_cache.get(key)
+        if hit is not None and hit[0] == stamp:
+            return hit[1]
+        value = fn()
+        self._stamped_cache[key] = (stamp, value)
+        return value
+    
+    def invalidate_cache(self) -> None:
+        """Drop cached read results after the repository changed."""
+        self._cache.clear()
+        self._stamped_cache.clear()
     
     def _find_repo_root(self) -> Optional[Path]:
         """Find git repository root."""
-        try:
-            result = subprocess.run(
-                ["git", "rev-parse", "--show-toplevel"],
-                capture_output=True,
-                text=True,
-                encoding="utf-8",
-                errors="replace"
-            )
-            if result.returncode == 0:
-                return Path(result.stdout.strip())
-        except Exception:
-            pass
-        return None
+        return find_repo_root(os.getcwd())
+    
+    def get_status(self) -> GitStatus:
+        """Get detailed git status (cached for ``CACHE_TTL`` seconds)."""
+        return self._cached(("status",), self._get_status)
+    
+    async def get_status_async(self) -> GitStatus:
+        """Async variant of ``get_status`` that does not block the event loop.
+        
+        Shares the same TTL cache as ``get_status``.
+        """
+        key = ("status",)
+        hit = self._cache.get(key)
+        if hit is not None and time.monotonic() - hit[0] < self.CACHE_TTL:
+            return hit[1]
+        status = await self._get_status_async()
+        self._cache[key] = (time.monotonic(), status)
+        return status
+    
+    def get_staged_diff(self, max_lines: Optional[int] = None) -> str:
+        """Get diff of staged changes (cached until the index or HEAD changes).
+        
+        Args:
+            max_lines: If set, truncate with ``format_diff_for_ai`` before
+                decoding so the dropped middle of a large diff is never decoded
+        """
+        return self._cached_by_stamp(
+            ("diff", "--cached", max_lines),
+            self.STAGED_STAMP_FILES,
+            lambda: self._get_staged_diff(max_lines),
+        )
+    
+    def get_staged_diff_head(self, lines: int) -> str:
+        """Get the first ``lines`` lines of the staged diff (cached like ``get_staged_diff``).
+        
+        git is stopped once enough output has been read, so a huge
+        changeset is never diffed or buffered in full.
+        """
+        return self._cached_by_stamp(
+            ("diff", "--cached", "head", lines),
+            self.STAGED_STAMP_FILES,
+            lambda: self._get_staged_diff_head(lines),
+        )
+    
+    def get_recent_commits(self, n: int = 3) -> List[str]:
+        """Get recent commit messages for context (cached until HEAD changes)."""
+        return self._cached_by_stamp(("log", n), self.HEAD_STAMP_FILES, lambda: self._get_recent_commits(n))
     
     def is_git_repo(self) -> bool:
         """Check if current directory is in a git repository."""
-        return self.repo_root is not None
+        return self._is_repo
     
-    def get_status(self) -> GitStatus:
-        """Get detailed git status."""
+    def _get_status(self) -> GitStatus:
+        """Get detailed git status.
+        
+        Branch, ahead/behind and file states all come from a single
+        ``git status --porcelain=v2 --branch -z`` call whose output is parsed
+        record by record as it streams in.
+        """
         status = GitStatus()
         
-        # Get branch and ahead/behind info
         try:
-            # Branch name
-            result = subprocess.run(
-                ["git", "branch", "--show-current"],
-                capture_output=True,
-                text=True,
-                encoding="utf-8",
-                errors="replace"
-            )
-            if result.returncode == 0:
-                status.branch = result.stdout.strip()
-            
-            # Ahead/behind
-            result = subprocess.run(
-                ["git", "rev-list", "--left-right", "--count", f"HEAD...@{u}"],
-                capture_output=True,
-                text=True,
-                encoding="utf-8",
-                errors="replace"
-            )
-            if result.returncode == 0:
-                parts = result.stdout.strip().split()
-                if len(parts) == 2:
-                    status.behind = int(parts[1])  # commits we are behind
-                    status.ahead = int(parts[0])   # commits we are ahead
+            with subprocess.Popen(
+                _STATUS_CMD,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            ) as proc:
+                _parse_porcelain_v2(_iter_nul_records(proc.stdout), status)
+            if proc.returncode != 0:
+                return GitStatus()
         except Exception:
             pass
         
-        # Get detailed status
+        return status
+    
+    async def _get_status_async(self) -> GitStatus:
+        """Get detailed git status via an asyncio subprocess."""
+        status = GitStatus()
+        
         try:
-            result = subprocess.run(
-                ["git", "status", "--porcelain"],
-                capture_output=True,
-                text=True,
-                encoding="utf-8",
-                errors="replace"
+            proc = await asyncio.create_subprocess_exec(
+                *_STATUS_CMD,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
             )
-            if result.returncode == 0:
-                for line in result.stdout.splitlines():
-                    if len(line) < 3:
-                        continue
-                    
-                    index_status = line[0]
-                    worktree_status = line[1]
-                    file_path = line[3:]
-                    
-                    # Check for conflicts
-                    if index_status in "UD" or worktree_status in "UD" or index_status == worktree_status == "A":
-                        status.has_conflicts = True
-                        status.conflicted_files.append(file_path)
-                    elif index_status == "M" or index_status == "A" or index_status == "D" or index_status == "R":
-                        status.staged.append(file_path)
-                    elif worktree_status == "M" or worktree_status == "D":
-                        status.unstaged.append(file_path)
-                    elif index_status == "?":
-                        status.untracked.append(file_path)
+            stdout, _ = await proc.communicate()
+            if proc.returncode != 0:
+                return status
+            _parse_porcelain_v2(stdout.split(b"\0"), status)
         except Exception:
             pass
         
         return status
     
-    def get_staged_diff(self) -> str:
-        """Get diff of staged changes."""
+    def _get_staged_diff(self, max_lines: Optional[int] = None) -> str:
+        """Get diff of staged changes.
+        
+        With ``max_lines``, ``git diff --cached --numstat`` is consulted first;
+        if the full diff would exceed the budget only the smallest files are
+        fetched, so large changesets are never piped through in full.
+        """
         try:
-            result = subprocess.run(
+            paths: List[str] = []
+            omitted: List[str] = []
+            if max_lines is not None:
+                files = self._get_staged_numstat()
+                # Approximate diff size: changed lines plus ~6 header lines per file
+                if sum(lines for lines, _ in files) + 6 * len(files) > max_lines:
+                    budget = max_lines
+                    for lines, file_paths in sorted(files, key=lambda f: f[0]):
+                        if paths and lines + 6 > budget:
+                            omitted.append(file_paths[-1])
+                            continue
+                        budget -= lines + 6
+                        paths.extend(file_paths)
+            
+            cmd = ["git", "--literal-pathspecs", "diff", "--cached", "--no-color"]
+            if paths:
+                cmd += ["--", *paths]
+            result = subprocess.run(cmd, capture_output=True)
+            if result.returncode != 0:
+                return ""
+            if max_lines is None:
+                return result.stdout.decode("utf-8", "replace")
+            
+            diff = format_diff_for_ai(result.stdout, max_lines=max_lines)
+            if omitted:
+                diff = diff.rstrip("\n") + f"\n... ({len(omitted)} file(s) omitted: {', '.join(omitted)})"
+            return diff
+        except Exception:
+            return ""
+    
+    def _get_staged_diff_head(self, lines: int) -> str:
+        """Stream ``git diff --cached`` and stop it after ``lines`` lines."""
+        try:
+            proc = subprocess.Popen(
                 ["git", "diff", "--cached", "--no-color"],
-                capture_output=True,
-                encoding="utf-8",
-                errors="replace"
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
             )
-            return result.stdout if result.returncode == 0 else ""
-        except Exception:
+        except OSError:
             return ""
+        
+        with proc:
+            head = list(itertools.islice(proc.stdout, lines))
+            stopped = len(head) == lines and proc.poll() is None
+            if stopped:
+                proc.terminate()
+            proc.stdout.close()
+            returncode = proc.wait()
+        
+        if returncode != 0 and not stopped:
+            return ""
+        return b"".join(head).decode("utf-8", "replace")
     
-    def get_recent_commits(self, n: int = 3) -> List[str]:
+    def _get_staged_numstat(self) -> List[Tuple[int, List[str]]]:
+        """List staged files as (changed lines, [paths]) from ``--numstat -z``.
+        
+        Renames carry both the old and the new path. Binary files count as 0.
+        """
+        result = subprocess.run(
+            ["git", "diff", "--cached", "--numstat", "-z"],
+            capture_output=True
+        )
+        if result.returncode != 0:
+            return []
+        
+        files: List[Tuple[int, List[str]]] = []
+        records = iter(result.stdout.split(b"\0"))
+        for record in records:
+            if not record:
+                continue
+            added, deleted, path = record.split(b"\t", 2)
+            lines = (int(added) if added.isdigit() else 0) + (int(deleted) if deleted.isdigit() else 0)
+            if path:
+                file_paths = [_decode_path(path)]
+            else:
+                # Rename/copy: old and new paths follow as separate records
+                file_paths = [_decode_path(next(records)), _decode_path(next(records))]
+            files.append((lines, file_paths))
+        return files
+    
+    def _get_recent_commits(self, n: int) -> List[str]:
         """Get recent commit messages for context."""
         try:
             result = subprocess.run(
@@ -184,6 +339,7 @@ class GitHelper:
         
         self.console.print("[dim]正在拉取远程代码...[/dim]")
         
+        self.invalidate_cache()
         result = subprocess.run(
             cmd,
             capture_output=True,
@@ -204,6 +360,7 @@ class GitHelper:
         """Push to remote. Returns (success, message)."""
         self.console.print("[dim]正在推送到远程...[/dim]")
         
+        self.invalidate_cache()
         result = subprocess.run(
             ["git", "push"],
             capture_output=True,
@@ -219,6 +376,7 @@ class GitHelper:
     
     def stage_all(self) -> bool:
         """Stage all changes."""
+        self.invalidate_cache()
         result = subprocess.run(
             ["git", "add", "-A"],
             capture_output=True
@@ -227,6 +385,7 @@ class GitHelper:
     
     def commit(self, message: str) -> bool:
         """Create a commit."""
+        self.invalidate_cache()
         result = subprocess.run(
             ["git", "commit", "-m", message],
             capture_output=True,
@@ -236,6 +395,26 @@ class GitHelper:
         )
         return result.returncode == 0
     
+    def stage_and_commit(self, message: str, include_untracked: bool = True) -> bool:
+        """Stage changes and commit them, in one git process when possible.
+        
+        ``git commit -a`` stages tracked modifications and deletions itself,
+        so a separate ``git add -A`` is only run when untracked files need to
+        be included.
+        """
+        if include_untracked and self.get_status().untracked:
+            return self.stage_all() and self.commit(message)
+        
+        self.invalidate_cache()
+        result = subprocess.run(
+            ["git", "commit", "-a", "-m", message],
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            errors="replace"
+        )
+        return result.returncode == 0
+    
     def get_conflict_details(self, file_path: str) -> Optional[ConflictInfo]:
         """Get details of a conflicted file."""
         try:
@@ -243,17 +422,16 @@ class GitHelper:
             if not file_full_path.exists():
                 return None
             
-            content = file_full_path.read_text(encoding="utf-8", errors="replace")
-            
-            # Parse conflict markers
-            ours_match = re.search(r"<<<<<<< HEAD\n(.*?)=======", content, re.DOTALL)
-            theirs_match = re.search(r"=======(.*?)>>>>>>> ", content, re.DOTALL)
+            # Parse conflict markers in one pass, decoding only the hunks
+            match = _CONFLICT_RE.search(file_full_path.read_bytes())
             
-            if ours_match and theirs_match:
+            if match:
+                ours, base, theirs = match.groups()
                 return ConflictInfo(
                     file=file_path,
-                    ours_content=ours_match.group(1).strip(),
-                    theirs_content=theirs_match.group(1).strip()
+                    ours_content=ours.decode("utf-8", "replace").strip(),
+                    theirs_content=theirs.decode("utf-8", "replace").strip(),
+                    base_content=base.decode("utf-8", "replace").strip() if base is not None else None
                 )
         except Exception:
             pass
@@ -261,6 +439,7 @@ class GitHelper:
     
     def resolve_conflict(self, file_path: str, resolution: str, content: str) -> bool:
         """Resolve a conflict by writing resolved content."""
+        self.invalidate_cache()
         try:
             file_full_path = self.repo_root / file_path
             file_full_path.write_text(content, encoding="utf-8")
@@ -276,6 +455,7 @@ class GitHelper:
     
     def abort_rebase(self) -> bool:
         """Abort current rebase."""
+        self.invalidate_cache()
         result = subprocess.run(
             ["git", "rebase", "--abort"],
             capture_output=True
@@ -284,6 +464,7 @@ class GitHelper:
     
     def continue_rebase(self) -> bool:
         """Continue rebase after resolving conflicts."""
+        self.invalidate_cache()
         result = subprocess.run(
             ["git", "rebase", "--continue"],
             capture_output=True,
@@ -294,26 +475,181 @@ class GitHelper:
         return result.returncode == 0
 
 
-def format_diff_for_ai(diff: str, max_lines: int = 100) -> str:
-    """Format diff for AI consumption, limiting size."""
-    lines = diff.splitlines()
+def _has_git_marker(directory: Path) -> bool:
+    """Check for a ``.git`` directory, or a ``.git`` file pointing at one."""
+    marker = directory / ".git"
+    if marker.is_dir():
+        return True
+    if marker.is_file():
+        # Worktrees and submodules use a "gitdir: <path>" file
+        try:
+            with open(marker, "rb") as f:
+                return f.read(7) == b"gitdir:"
+        except OSError:
+            return False
+    return False
+
+
+def _resolve_git_dir(repo_root: Path) -> Optional[Path]:
+    """Locate the git dir for a repo root, following a ``gitdir:`` file."""
+    marker = repo_root / ".git"
+    if marker.is_dir():
+        return marker
+    try:
+        text = marker.read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    if not text.startswith("gitdir:"):
+        return None
+    git_dir = Path(text[len("gitdir:"):].strip())
+    return git_dir if git_dir.is_absolute() else (repo_root / git_dir).resolve()
+
+
+# cwd -> repo root; misses are not stored, so a later ``git init`` is seen
+_repo_roots: Dict[str, Path] = {}
+
+
+def find_repo_root(cwd: str) -> Optional[Path]:
+    """Find the git repository root containing ``cwd`` (cached per directory).
     
-    if len(lines) > max_lines:
+    Walks up the parents looking for a ``.git`` entry instead of spawning
+    ``git rev-parse``. A cached root is dropped once its ``.git`` is gone.
+    """
+    hit = _repo_roots.get(cwd)
+    if hit is not None and _has_git_marker(hit):
+        return hit
+    try:
+        path = Path(cwd).resolve()
+        for candidate in (path, *path.parents):
+            if _has_git_marker(candidate):
+                _repo_roots[cwd] = candidate
+                return candidate
+    except Exception:
+        pass
+    _repo_roots.pop(cwd, None)
+    return None
+
+
+def _iter_nul_records(stream: IO[bytes], chunk_size: int = 65536) -> Iterator[bytes]:
+    """Yield raw NUL-terminated records from a binary stream."""
+    pending = b""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        parts = (pending + chunk).split(b"\0")
+        pending = parts.pop()
+        yield from parts
+    if pending:
+        yield pending
+
+
+def _decode_path(raw: bytes) -> str:
+    """Decode a path from git output."""
+    return raw.decode("utf-8", "replace")
+
+
+def _parse_porcelain_v2(records: Iterable[bytes], status: GitStatus) -> None:
+    """Fill ``status`` from NUL-separated ``git status --porcelain=v2 --branch`` records.
+    
+    Records stay as bytes; only branch names and file paths are decoded.
+    """
+    skip_next = False
+    for record in records:
+        if skip_next:
+            # Original path of a rename/copy entry
+            skip_next = False
+            continue
+        if not record:
+            continue
+        
+        kind = record[:1]
+        if kind == b"#":
+            if record.startswith(b"# branch.head "):
+                head = record[len(b"# branch.head "):]
+                status.branch = "" if head == b"(detached)" else _decode_path(head)
+            elif record.startswith(b"# branch.ab "):
+                parts = record[len(b"# branch.ab "):].split()
+                if len(parts) == 2:
+                    status.ahead = int(parts[0])    # commits we are ahead
+                    status.behind = -int(parts[1])  # commits we are behind
+        elif kind == b"1":
+            # 1 XY sub mH mI mW hH hI path
+            _classify_entry(status, record[2:3], record[3:4], record.split(b" ", 8)[8])
+        elif kind == b"2":
+            # 2 XY sub mH mI mW hH hI Xscore path, followed by the original path
+            _classify_entry(status, record[2:3], record[3:4], record.split(b" ", 9)[9])
+            skip_next = True
+        elif kind == b"u":
+            # u XY sub m1 m2 m3 mW h1 h2 h3 path
+            status.has_conflicts = True
+            status.conflicted_files.append(_decode_path(record.split(b" ", 10)[10]))
+        elif kind == b"?":
+            status.untracked.append(_decode_path(record[2:]))
+
+
+def _classify_entry(status: GitStatus, index_status: bytes, worktree_status: bytes, file_path: bytes) -> None:
+    """Sort a tracked, non-conflicted entry into staged or unstaged."""
+    if index_status != b".":
+        status.staged.append(_decode_path(file_path))
+    elif worktree_status != b".":
+        status.unstaged.append(_decode_path(file_path))
+
+
+def format_diff_for_ai(diff: Union[str, bytes], max_lines: int = 100) -> str:
+    """Format diff for AI consumption, limiting size.
+    
+    Accepts raw ``bytes`` from git as well; lines are counted and sliced
+    without splitting the whole diff, and only the kept head and tail are
+    decoded.
+    """
+    nl = b"\n" if isinstance(diff, bytes) else "\n"
+    body_end = len(diff) - 1 if diff.endswith(nl) else len(diff)
+    line_count = diff.count(nl, 0, body_end) + 1 if body_end > 0 else 0
+    
+    if line_count > max_lines:
         # Keep first 50 and last 50 lines
-        truncated = lines[:50] + ["... (truncated) ..."] + lines[-50:]
-        return "\n".join(truncated)
+        head_end = -1
+        for _ in range(50):
+            head_end = diff.find(nl, head_end + 1, body_end)
+            if head_end < 0:
+                head_end = body_end
+                break
+        tail_start = body_end
+        for _ in range(50):
+            tail_start = diff.rfind(nl, 0, tail_start)
+            if tail_start < 0:
+                break
+        head, tail = diff[:head_end], diff[tail_start + 1:body_end]
+        if isinstance(diff, bytes):
+            head, tail = head.decode("utf-8", "replace"), tail.decode("utf-8", "replace")
+        return f"{head}\n... (truncated) ...\n{tail}"
     
+    if isinstance(diff, bytes):
+        return diff.decode("utf-8", "replace")
     return diff
 
 
+# Keywords that signal the user wants to commit/push
+COMMIT_KEYWORDS = (
+    "提交", "commit", "push", "推送",
+    "保存代码", "上传代码", "提交代码",
+    "commit changes", "push changes",
+    "save and push", "commit and push",
+)
+
+# Keywords that contain a shorter keyword (e.g. "commit and push") can never
+# change the result, so only the minimal ones go into the alternation
+_INTENT_KEYWORDS = tuple(
+    k for k in COMMIT_KEYWORDS
+    if not any(other != k and other in k for other in COMMIT_KEYWORDS)
+)
+
+# Folded into one case-insensitive alternation so a message is scanned once
+# without lowercasing a copy of it first
+_COMMIT_INTENT_RE = re.compile("|".join(re.escape(k) for k in _INTENT_KEYWORDS), re.IGNORECASE)
+
+
 def detect_commit_intent(user_input: str) -> bool:
     """Detect if user wants to commit/push."""
-    commit_keywords = [
-        "提交", "commit", "push", "推送",
-        "保存代码", "上传代码", "提交代码",
-        "commit changes", "push changes",
-        "save and push", "commit and push",
-    ]
-    
-    user_lower = user_input.lower()
-    return any(keyword in user_lower for keyword in commit_keywords)
+    return _COMMIT_INTENT_RE.search(user_input) is not None
@@ -1,6 +1,8 @@
 """Enhanced Markdown rendering with syntax highlighting for code blocks."""
 
 import re
+from functools import lru_cache
+from typing import Optional
 from rich.console import Console, Group
 from rich.markdown import Markdown
 from rich.panel import Panel
@@ -8,6 +10,36 @@ from rich.syntax import Syntax
 from rich.text import Text
 
 
+class _CachedSyntax(Syntax):
+    """Syntax that runs the Pygments lexer once and reuses the result."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._highlight_cache: dict = {}
+    
+    def highlight(self, code, line_range=None) -> Text:
+        key = (code, line_range)
+        text = self._highlight_cache.get(key)
+        if text is None:
+            text = super().highlight(code, line_range)
+            self._highlight_cache[key] = text
+        # Rendering may trim the returned Text, so hand out a copy
+        return text.copy()
+
+
+@lru_cache(maxsize=128)
+def _build_syntax(code: str, lang: str) -> Syntax:
+    """Build (and memoize) the Syntax renderable for a code block."""
+    return _CachedSyntax(
+        code,
+        lang,
+        theme="monokai",
+        line_numbers=False,
+        word_wrap=True,
+        padding=(1, 2),
+    )
+
+
 class CodeBlock:
     """Represents a code block in markdown."""
     
@@ -31,15 +63,8 @@ class CodeBlock:
         
         syntax_lang = lang_map.get(self.language.lower(), self.language.lower())
         
-        # Create syntax highlighted code
-        syntax = Syntax(
-            self.code,
-            syntax_lang,
-            theme="monokai",
-            line_numbers=False,
-            word_wrap=True,
-            padding=(1, 2),
-        )
+        # Create syntax highlighted code (shared across identical blocks)
+        syntax = _build_syntax(self.code, syntax_lang)
         
         # Create header with language and copy hint
         header_text = f"[Code] {self.language.upper() if self.language else 'CODE'}"
@@ -55,6 +80,57 @@ class CodeBlock:
         )
 
 
+def _build_parts(pieces: list) -> tuple:
+    """Turn split() output [text, lang, code, ..., text] into parts."""
+    parts = []
+    for i in range(0, len(pieces) - 1, 3):
+        text_part = pieces[i]
+        if text_part and not text_part.isspace():
+            parts.append(("text", text_part))
+        parts.append(("code", CodeBlock(pieces[i + 1], pieces[i + 2])))
+    
+    # Add remaining text
+    text_part = pieces[-1]
+    if text_part and not text_part.isspace():
+        parts.append(("text", text_part))
+    
+    return tuple(parts)
+
+
+@lru_cache(maxsize=64)
+def _parse_parts(content: str) -> tuple:
+    """Split markdown into ("text", str) and ("code", CodeBlock) parts.
+    
+    Cached because streaming output re-renders the same content repeatedly.
+    """
+    return _build_parts(EnhancedMarkdown.CODE_BLOCK_PATTERN.split(content))
+
+
+# Fence followed by a language tag with non-ASCII characters
+_NON_ASCII_TAG_B = re.compile(rb'```\w*[\x80-\xff]')
+
+
+@lru_cache(maxsize=64)
+def _split_bytes(data: bytes) -> tuple:
+    """Split raw UTF-8 markdown like ``CODE_BLOCK_PATTERN.split``.
+    
+    The scan runs on the bytes; each piece is decoded exactly once.
+    """
+    if _NON_ASCII_TAG_B.search(data):
+        # Bytes \w is ASCII-only, so only the str pattern matches such tags
+        return tuple(EnhancedMarkdown.CODE_BLOCK_PATTERN.split(data.decode("utf-8", "replace")))
+    pieces = EnhancedMarkdown.CODE_BLOCK_PATTERN_B.split(data)
+    return tuple(piece.decode("utf-8", "replace") for piece in pieces)
+
+
+def _join_pieces(pieces: tuple) -> str:
+    """Rebuild the markdown source from split() pieces."""
+    out = [pieces[0]]
+    for i in range(1, len(pieces) - 1, 3):
+        out += ("```", pieces[i], "\n", pieces[i + 1], "```", pieces[i + 2])
+    return "".join(out)
+
+
 class EnhancedMarkdown:
     """Enhanced markdown renderer with better code block support."""
     
@@ -63,36 +139,44 @@ class EnhancedMarkdown:
         re.DOTALL
     )
     
-    def __init__(self, content: str):
-        self.content = content
+    # Same pattern for raw UTF-8 buffers (markers are ASCII)
+    CODE_BLOCK_PATTERN_B = re.compile(
+        rb'```(\w*)\n(.*?)```',
+        re.DOTALL
+    )
+    
+    def __init__(self, content: Optional[str] = None, *, pieces: Optional[tuple] = None):
+        """Create from markdown text, or from already split pieces.
+        
+        Args:
+            content: Markdown source
+            pieces: ``CODE_BLOCK_PATTERN.split`` output; ``content`` is then
+                only joined from them if something reads it
+        """
+        self._content = content
+        self._pieces = pieces
         self.parts = self._parse()
     
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "EnhancedMarkdown":
+        """Create from raw UTF-8 bytes, e.g. a stream or subprocess buffer.
+        
+        Code blocks are found on the bytes and each piece is decoded once.
+        """
+        return cls(pieces=_split_bytes(data))
+    
+    @property
+    def content(self) -> str:
+        """Markdown source."""
+        if self._content is None:
+            self._content = _join_pieces(self._pieces)
+        return self._content
+    
     def _parse(self) -> list:
         """Parse content into parts (text or code blocks)."""
-        parts = []
-        last_end = 0
-        
-        for match in self.CODE_BLOCK_PATTERN.finditer(self.content):
-            # Add text before code block
-            if match.start() > last_end:
-                text_part = self.content[last_end:match.start()]
-                if text_part.strip():
-                    parts.append(("text", text_part))
-            
-            # Add code block
-            language = match.group(1)
-            code = match.group(2)
-            parts.append(("code", CodeBlock(language, code)))
-            
-            last_end = match.end()
-        
-        # Add remaining text
-        if last_end < len(self.content):
-            text_part = self.content[last_end:]
-            if text_part.strip():
-                parts.append(("text", text_part))
-        
-        return parts
+        if self._pieces is not None:
+            return list(_build_parts(self._pieces))
+        return list(_parse_parts(self._content))
     
     def __rich__(self):
         """Render as Rich console output."""
@@ -13,16 +13,53 @@ class MessageRole(str, Enum):
     ASSISTANT = "assistant"
 
 
-@dataclass
+# Plain role strings, looked up once instead of via .value per message
+_ROLE_STR = {role: role.value for role in MessageRole}
+
+
 class Message:
-    """A single message in the conversation."""
+    """A single message in the conversation.
+    
+    Slotted; the OpenAI-format payload is built when the message is created
+    and rebuilt only when ``role`` or ``content`` is reassigned.
+    """
+    
+    __slots__ = ("_role", "_content", "_payload")
+    
+    def __init__(self, role: MessageRole, content: str):
+        self._role = role
+        self._content = content
+        self._payload = {"role": _ROLE_STR[role], "content": content}
+    
+    @property
+    def role(self) -> MessageRole:
+        return self._role
+    
+    @role.setter
+    def role(self, value: MessageRole) -> None:
+        self._role = value
+        self._payload = {"role": _ROLE_STR[value], "content": self._content}
+    
+    @property
+    def content(self) -> str:
+        return self._content
+    
+    @content.setter
+    def content(self, value: str) -> None:
+        self._content = value
+        self._payload = {"role": _ROLE_STR[self._role], "content": value}
+    
+    def __repr__(self) -> str:
+        return f"Message(role={self._role!r}, content={self._content!r})"
     
-    role: MessageRole
-    content: str
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Message):
+            return NotImplemented
+        return self._role == other._role and self._content == other._content
     
     def to_openai_format(self) -> dict[str, str]:
-        """Convert to OpenAI API format."""
-        return {"role": self.role.value, "content": self.content}
+        """Convert to OpenAI API format (shared; treat the result as read-only)."""
+        return self._payload
 
 
 @dataclass 
@@ -1,12 +1,16 @@
 """Model presets for Sun CLI - flagship models from major providers."""
 
-from dataclasses import dataclass
-from typing import Literal
+import json
+import os
+import threading
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Literal, Optional
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ModelPreset:
-    """Model preset configuration."""
+    """Model preset configuration (immutable static data)."""
     name: str
     provider: str
     model_id: str
@@ -208,27 +212,136 @@ MODEL_PRESETS: dict[str, list[ModelPreset]] = {
 }
 
 
+# Flat view and model-id index, built once at import
+_ALL_PRESETS: tuple[ModelPreset, ...] = tuple(
+    preset for provider_models in MODEL_PRESETS.values() for preset in provider_models
+)
+# reversed() so the first preset wins if a model id is listed twice
+_PRESETS_BY_ID: dict[str, ModelPreset] = {preset.model_id: preset for preset in reversed(_ALL_PRESETS)}
+_PRESETS_BY_PROVIDER: dict[str, tuple[ModelPreset, ...]] = {
+    provider: tuple(provider_models) for provider, provider_models in MODEL_PRESETS.items()
+}
+_PROVIDER_NAMES: tuple[str, ...] = tuple(MODEL_PRESETS)
+
+# Pricing/context overrides keyed by model id, e.g.
+# {"gpt-4o": {"pricing": "...", "context_length": "128K"}}.
+# Loaded from disk on first use; the shipped presets are the fallback.
+_model_meta: Optional[dict[str, dict[str, str]]] = None
+
+
+def _model_meta_path() -> Path:
+    """Path of the cached model metadata."""
+    from .config import get_config_dir
+    return get_config_dir() / "model_meta.json"
+
+
+# Preset fields the metadata may override
+_META_FIELDS = ("context_length", "pricing")
+
+
+def _clean_model_meta(data: Any) -> dict[str, dict[str, str]]:
+    """Keep only well-formed overrides from a metadata payload.
+    
+    Numbers (e.g. ``"context_length": 128000``) are converted to str; any
+    other non-str value, unknown field or malformed entry is dropped, so the
+    overrides are always renderable.
+    """
+    if not isinstance(data, dict):
+        return {}
+    meta: dict[str, dict[str, str]] = {}
+    for model_id, override in data.items():
+        if not isinstance(model_id, str) or not isinstance(override, dict):
+            continue
+        fields = {}
+        for field in _META_FIELDS:
+            value = override.get(field)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                value = str(value)
+            if isinstance(value, str) and value:
+                fields[field] = value
+        if fields:
+            meta[model_id] = fields
+    return meta
+
+
+def _get_model_meta() -> dict[str, dict[str, str]]:
+    """Return the cached model metadata, reading it from disk once.
+    
+    The first call also starts a background refresh when
+    ``SUN_PRICING_URL`` is set; the cached data is served meanwhile.
+    """
+    global _model_meta
+    if _model_meta is None:
+        try:
+            data = json.loads(_model_meta_path().read_text(encoding="utf-8"))
+            _model_meta = _clean_model_meta(data)
+        except Exception:
+            _model_meta = {}
+        pricing_url = os.environ.get("SUN_PRICING_URL")
+        if pricing_url:
+            threading.Thread(
+                target=_refresh_model_meta, args=(pricing_url,), name="suncli-pricing", daemon=True
+            ).start()
+    return _model_meta
+
+
+def _refresh_model_meta(url: str) -> None:
+    """Fetch fresh model metadata and atomically replace the cache (runs in background)."""
+    global _model_meta
+    try:
+        import httpx
+        response = httpx.get(url, timeout=10.0, follow_redirects=True)
+        response.raise_for_status()
+        data = response.json()
+        if not isinstance(data, dict):
+            return
+        data = _clean_model_meta(data)
+        path = _model_meta_path()
+        tmp_path = path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, path)
+        _model_meta = data
+    except Exception:
+        pass
+
+
+def _with_meta(preset: ModelPreset, meta: dict[str, dict[str, str]]) -> ModelPreset:
+    """Apply cached pricing/context overrides to a preset."""
+    override = meta.get(preset.model_id)
+    if not override:
+        return preset
+    return replace(
+        preset,
+        context_length=override.get("context_length", preset.context_length),
+        pricing=override.get("pricing", preset.pricing),
+    )
+
+
 def get_all_presets() -> list[ModelPreset]:
     """Get all model presets as a flat list."""
-    presets = []
-    for provider_models in MODEL_PRESETS.values():
-        presets.extend(provider_models)
-    return presets
+    meta = _get_model_meta()
+    if not meta:
+        return list(_ALL_PRESETS)
+    return [_with_meta(preset, meta) for preset in _ALL_PRESETS]
 
 
 def get_preset_by_model_id(model_id: str) -> ModelPreset | None:
     """Get preset by model ID."""
-    for preset in get_all_presets():
-        if preset.model_id == model_id:
-            return preset
-    return None
+    preset = _PRESETS_BY_ID.get(model_id)
+    if preset is None:
+        return None
+    return _with_meta(preset, _get_model_meta())
 
 
-def get_presets_by_provider(provider: str) -> list[ModelPreset]:
-    """Get presets by provider name."""
-    return MODEL_PRESETS.get(provider, [])
+def get_presets_by_provider(provider: str) -> tuple[ModelPreset, ...]:
+    """Get presets by provider name (shared, immutable)."""
+    presets = _PRESETS_BY_PROVIDER.get(provider, ())
+    meta = _get_model_meta()
+    if not meta:
+        return presets
+    return tuple(_with_meta(preset, meta) for preset in presets)
 
 
-def get_provider_names() -> list[str]:
-    """Get all provider names."""
-    return list(MODEL_PRESETS.keys())
+def get_provider_names() -> tuple[str, ...]:
+    """Get all provider names (shared, immutable)."""
+    return _PROVIDER_NAMES
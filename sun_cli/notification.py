@@ -1,12 +1,92 @@
 """Notification and sound effects for Sun CLI."""
 
+import atexit
 import os
-import platform
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Optional, Tuple
 
 from rich.console import Console
 
+if sys.platform == "win32":
+    import winsound
+else:
+    winsound = None
+
+# macOS system sound
+_MACOS_SOUND = "/System/Library/Sounds/Glass.aiff"
+
+# Linux sound files for paplay / aplay
+_PAPLAY_SOUND = "/usr/share/sounds/freedesktop/stereo/complete.oga"
+_APLAY_SOUND = "/usr/share/sounds/alsa/Front_Center.wav"
+
+# Toast script for the PowerShell fallback. Title/message arrive via env vars
+# and are added as XML text nodes, so they need no quoting or escaping.
+_PS_TOAST_SCRIPT = """
+[Windows.UI.Notifications.ToastNotificationManager, Windows.UI.Notifications, ContentType = WindowsRuntime] | Out-Null
+[Windows.Data.Xml.Dom.XmlDocument, Windows.Data.Xml.Dom.XmlDocument, ContentType = WindowsRuntime] | Out-Null
+$xml = New-Object Windows.Data.Xml.Dom.XmlDocument
+$xml.LoadXml("<toast><visual><binding template='ToastGeneric'><text/><text/></binding></visual></toast>")
+$texts = $xml.GetElementsByTagName('text')
+$texts.Item(0).AppendChild($xml.CreateTextNode($env:TOAST_TITLE)) | Out-Null
+$texts.Item(1).AppendChild($xml.CreateTextNode($env:TOAST_MSG)) | Out-Null
+$toast = [Windows.UI.Notifications.ToastNotification]::new($xml)
+[Windows.UI.Notifications.ToastNotificationManager]::CreateToastNotifier('Sun CLI').Show($toast)
+"""
+
+# win10toast notifier, created on the first Windows notification and reused
+_toast_notifier: Optional[Any] = None
+
+
+def _get_toast_notifier() -> Any:
+    """Return the shared ToastNotifier (raises ImportError without win10toast)."""
+    global _toast_notifier
+    if _toast_notifier is None:
+        import win10toast
+        _toast_notifier = win10toast.ToastNotifier()
+    return _toast_notifier
+
+
+def _load_macos_sound() -> Optional[Tuple[Callable[[int], None], int]]:
+    """Register the macOS sound with AudioToolbox.
+    
+    Returns:
+        (AudioServicesPlaySystemSound, sound id), or None if unavailable
+    """
+    try:
+        import ctypes
+        core_foundation = ctypes.CDLL("/System/Library/Frameworks/CoreFoundation.framework/CoreFoundation")
+        audio_toolbox = ctypes.CDLL("/System/Library/Frameworks/AudioToolbox.framework/AudioToolbox")
+        
+        create_url = core_foundation.CFURLCreateFromFileSystemRepresentation
+        create_url.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_long, ctypes.c_bool]
+        create_url.restype = ctypes.c_void_p
+        core_foundation.CFRelease.argtypes = [ctypes.c_void_p]
+        create_sound = audio_toolbox.AudioServicesCreateSystemSoundID
+        create_sound.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_uint32)]
+        create_sound.restype = ctypes.c_int32
+        play_sound = audio_toolbox.AudioServicesPlaySystemSound
+        play_sound.argtypes = [ctypes.c_uint32]
+        play_sound.restype = None
+        
+        path = _MACOS_SOUND.encode()
+        url = create_url(None, path, len(path), False)
+        if not url:
+            return None
+        sound_id = ctypes.c_uint32()
+        try:
+            status = create_sound(url, ctypes.byref(sound_id))
+        finally:
+            core_foundation.CFRelease(url)
+        if status != 0:
+            return None
+        return play_sound, sound_id.value
+    except Exception:
+        return None
+
 
 class NotificationManager:
     """Manages desktop notifications and sound effects."""
@@ -15,17 +95,48 @@ class NotificationManager:
         self.console = console
         self._sound_enabled = True
         self._notification_enabled = True
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._initialized = False
+        
+        self._is_windows = False
+        self._is_macos = False
+        self._is_linux = False
+        self._notify_send: Optional[str] = None
+        self._paplay: Optional[str] = None
+        self._aplay: Optional[str] = None
+        self._macos_sound: Optional[Tuple[Callable[[int], None], int]] = None
+    
+    def _lazy_init(self) -> None:
+        """Detect the platform and probe helpers on first use."""
+        if self._initialized:
+            return
         
         # Check if we're in a terminal that supports notifications
-        self._is_windows = platform.system() == "Windows"
-        self._is_macos = platform.system() == "Darwin"
-        self._is_linux = platform.system() == "Linux"
+        plat = sys.platform
+        self._is_windows = plat == "win32"
+        self._is_macos = plat == "darwin"
+        self._is_linux = plat.startswith("linux")
+        
+        # Register the macOS sound once; playing it is then a single call
+        if self._is_macos:
+            self._macos_sound = _load_macos_sound()
+        
+        # Probe Linux helpers once instead of failing a fork on every call
+        if self._is_linux:
+            self._notify_send = shutil.which("notify-send")
+            if os.path.exists(_PAPLAY_SOUND):
+                self._paplay = shutil.which("paplay")
+            if os.path.exists(_APLAY_SOUND):
+                self._aplay = shutil.which("aplay")
+        
+        self._initialized = True
     
     def show_notification(self, title: str, message: str) -> None:
         """Show desktop notification."""
         if not self._notification_enabled:
             return
         
+        self._lazy_init()
         try:
             if self._is_windows:
                 self._show_windows_notification(title, message)
@@ -39,8 +150,7 @@ class NotificationManager:
     def _show_windows_notification(self, title: str, message: str) -> None:
         """Show Windows notification using toast."""
         try:
-            import win10toast
-            toast = win10toast.ToastNotifier()
+            toast = _get_toast_notifier()
             toast.show_toast(
                 title=title,
                 msg=message,
@@ -54,25 +164,15 @@ class NotificationManager:
     
     def _show_windows_powershell_notification(self, title: str, message: str) -> None:
         """Show Windows notification using PowerShell."""
-        import subprocess
-        escaped_title = title.replace('"', '`"')
-        escaped_message = message.replace('"', '`"')
-        ps_command = f'''
-        [Windows.UI.Notifications.ToastNotificationManager, Windows.UI.Notifications, ContentType = WindowsRuntime]::new().ShowToastNotification(
-            [Windows.Data.Xml.Dom.XmlDocument, Windows.Data.Xml.Dom.XmlDocument, ContentType = WindowsRuntime]::new().LoadXml(
-                "<toast><visual><binding template='ToastGeneric'><text>{escaped_title}</text><text>{escaped_message}</text></binding></visual></toast>"
-            )
-        )
-        '''
         subprocess.run(
-            ["powershell", "-Command", ps_command],
+            ["powershell", "-NoProfile", "-Command", _PS_TOAST_SCRIPT],
+            env={**os.environ, "TOAST_TITLE": title, "TOAST_MSG": message},
             capture_output=True,
             timeout=2
         )
     
     def _show_macos_notification(self, title: str, message: str) -> None:
         """Show macOS notification."""
-        import subprocess
         subprocess.run([
             "osascript", "-e",
             f'display notification "{message}" with title "{title}"'
@@ -80,21 +180,20 @@ class NotificationManager:
     
     def _show_linux_notification(self, title: str, message: str) -> None:
         """Show Linux notification using libnotify."""
-        import subprocess
-        try:
-            subprocess.run([
-                "notify-send",
-                title,
-                message
-            ], capture_output=True, timeout=2)
-        except FileNotFoundError:
-            pass
+        if self._notify_send is None:
+            return
+        subprocess.run([
+            self._notify_send,
+            title,
+            message
+        ], capture_output=True, timeout=2)
     
     def play_success_sound(self) -> None:
         """Play success sound effect."""
         if not self._sound_enabled:
             return
         
+        self._lazy_init()
         try:
             if self._is_windows:
                 self._play_windows_sound()
@@ -107,38 +206,55 @@ class NotificationManager:
     
     def _play_windows_sound(self) -> None:
         """Play Windows system sound."""
-        import winsound
         winsound.MessageBeep(winsound.MB_ICONASTERISK)
     
     def _play_macos_sound(self) -> None:
         """Play macOS system sound."""
-        import subprocess
+        if self._macos_sound is not None:
+            play_sound, sound_id = self._macos_sound
+            play_sound(sound_id)
+            return
         subprocess.run([
             "afplay",
-            "/System/Library/Sounds/Glass.aiff"
+            _MACOS_SOUND
         ], capture_output=True, timeout=1)
     
     def _play_linux_sound(self) -> None:
         """Play Linux system sound."""
-        import subprocess
-        try:
-            subprocess.run([
-                "paplay",
-                "/usr/share/sounds/freedesktop/stereo/complete.oga"
-            ], capture_output=True, timeout=1)
-        except (FileNotFoundError, subprocess.TimeoutExpired):
+        if self._paplay is not None:
+            try:
+                subprocess.run([
+                    self._paplay,
+                    _PAPLAY_SOUND
+                ], capture_output=True, timeout=1)
+                return
+            except subprocess.TimeoutExpired:
+                pass
+        if self._aplay is not None:
             try:
                 subprocess.run([
-                    "aplay",
-                    "/usr/share/sounds/alsa/Front_Center.wav"
+                    self._aplay,
+                    _APLAY_SOUND
                 ], capture_output=True, timeout=1)
-            except (FileNotFoundError, subprocess.TimeoutExpired):
+            except subprocess.TimeoutExpired:
                 pass
     
     def notify_success(self, message: str = "Task completed successfully!") -> None:
-        """Show success notification with sound."""
-        self.show_notification("Sun CLI", message)
-        self.play_success_sound()
+        """Show success notification with sound.
+        
+        Both run on a background worker so the caller never waits on the
+        notification/sound subprocesses.
+        """
+        executor = self._get_executor()
+        executor.submit(self.show_notification, "Sun CLI", message)
+        executor.submit(self.play_success_sound)
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Create the single notification worker on first use."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="suncli-notify")
+            atexit.register(self._executor.shutdown, wait=False)
+        return self._executor
     
     def enable_sound(self, enabled: bool = True) -> None:
         """Enable or disable sound effects."""
@@ -2,7 +2,7 @@
 
 from enum import Enum
 from dataclasses import dataclass, field
-from typing import Optional, List
+from typing import Dict, Optional, List
 from rich.console import Console
 from rich.panel import Panel
 from rich.markdown import Markdown
@@ -18,7 +18,11 @@ class PlanMode(Enum):
     EXECUTING = "executing"
 
 
-@dataclass
+_STATUS_ICONS = {"pending": "⏳", "in_progress": "🔄", "completed": "✅"}
+_DEFAULT_ICON = "⏳"
+
+
+@dataclass(slots=True)
 class PlanStep:
     """A single step in a plan."""
     id: int
@@ -26,29 +30,65 @@ class PlanStep:
     status: str = "pending"
 
 
-@dataclass
+@dataclass(slots=True)
 class Plan:
     """A plan with multiple steps."""
     title: str
     description: str
     steps: List[PlanStep] = field(default_factory=list)
     status: PlanMode = PlanMode.PLANNING
+    _by_id: Dict[int, PlanStep] = field(default_factory=dict, repr=False)
+    _version: int = field(default=0, repr=False, compare=False)
+    _md_cache: Optional[str] = field(default=None, repr=False, compare=False)
+    
+    def invalidate(self) -> None:
+        """Mark the plan as changed so cached markdown is rebuilt."""
+        self._version += 1
+        self._md_cache = None
     
     def add_step(self, description: str) -> PlanStep:
         """Add a step to the plan."""
         step_id = len(self.steps) + 1
         step = PlanStep(id=step_id, description=description)
         self.steps.append(step)
+        self._by_id[step_id] = step
+        self.invalidate()
         return step
     
+    def get_step(self, step_id: int) -> Optional[PlanStep]:
+        """Get a step by id."""
+        return self._by_id.get(step_id)
+    
+    def clear_steps(self) -> None:
+        """Remove all steps."""
+        self.steps.clear()
+        self._by_id.clear()
+        self.invalidate()
+    
+    def set_step_status(self, step_id: int, status: str) -> bool:
+        """Update a step's status. Returns False if the step doesn't exist."""
+        step = self._by_id.get(step_id)
+        if step is None:
+            return False
+        if step.status != status:
+            step.status = status
+            self.invalidate()
+        return True
+    
     def to_markdown(self) -> str:
         """Convert plan to markdown format."""
-        md = f"# {self.title}\n\n"
-        md += f"{self.description}\n\n"
-        md += "## Implementation Steps\n\n"
+        if self._md_cache is not None:
+            return self._md_cache
+        parts: List[str] = [
+            f"# {self.title}\n\n",
+            f"{self.description}\n\n",
+            "## Implementation Steps\n\n",
+        ]
         for step in self.steps:
-            status_icon = {"pending": "⏳", "in_progress": "🔄", "completed": "✅"}.get(step.status, "⏳")
-            md += f"{status_icon} **Step {step.id}:** {step.description}\n\n"
+            status_icon = _STATUS_ICONS.get(step.status, _DEFAULT_ICON)
+            parts.append(f"{status_icon} **Step {step.id}:** {step.description}\n\n")
+        md = "".join(parts)
+        self._md_cache = md
         return md
 
 
@@ -99,7 +139,7 @@ class PlanModeManager:
         
         self._current_plan.title = title
         self._current_plan.description = description
-        self._current_plan.steps.clear()
+        self._current_plan.clear_steps()
         for step_desc in steps:
             self._current_plan.add_step(step_desc)
 
@@ -159,10 +199,7 @@ class PlanModeManager:
         if not self._current_plan:
             return
         
-        for step in self._current_plan.steps:
-            if step.id == step_id:
-                step.status = status
-                break
+        self._current_plan.set_step_status(step_id, status)
 
         task_id = self._step_task_map.get(step_id)
         if task_id is not None:
@@ -1,12 +1,23 @@
 """Prompt manager for Sun CLI."""
 
+import io
 import os
+import shutil
+import time
 from pathlib import Path
 from dataclasses import dataclass
 from typing import Optional
 
 
-@dataclass
+# Section headers of the assembled system prompt
+_HDR_SYSTEM = "# System\n"
+_HDR_SKILLS = "# Skills\n"
+_HDR_IDENTITY = "# Identity\n"
+_HDR_USER = "# User Context\n"
+_HDR_MEMORY = "# Memory\n"
+
+
+@dataclass(slots=True)
 class PromptContext:
     """Complete prompt context for the AI."""
     system: str = ""
@@ -22,9 +33,23 @@ class PromptManager:
     # Default prompts directory
     DEFAULT_PROMPTS_DIR = Path(__file__).parent / "default"
     
+    # Prompt files that make up the system prompt
+    SYSTEM_PROMPT_FILES = ("system", "identity", "user", "memory")
+    
+    # Max number of assembled system prompts kept in memory
+    ASSEMBLED_CACHE_SIZE = 16
+    
+    # Seconds a missing prompt file is remembered before checking again
+    MISSING_TTL = 1.0
+    
     def __init__(self, prompts_dir: Optional[Path] = None):
         self.prompts_dir = prompts_dir or self._get_user_prompts_dir()
         self.prompts_dir.mkdir(parents=True, exist_ok=True)
+        # name -> (mtime_ns, content)
+        self._read_cache: dict[str, tuple[int, str]] = {}
+        self._assembled_cache: dict[tuple, str] = {}
+        # name -> monotonic time the file was last found missing
+        self._missing: dict[str, float] = {}
         
         # Ensure default prompts exist
         self._ensure_default_prompts()
@@ -39,293 +64,130 @@ class PromptManager:
     
     def _ensure_default_prompts(self) -> None:
         """Copy default prompts if user doesn't have them."""
-        default_files = {
-            "system.md": DEFAULT_SYSTEM_PROMPT,
-            "identity.md": DEFAULT_IDENTITY_PROMPT,
-            "user.md": DEFAULT_USER_PROMPT,
-            "memory.md": "",
-        }
-        
-        for filename, content in default_files.items():
+        for filename in ("system.md", "identity.md", "user.md", "memory.md"):
             user_file = self.prompts_dir / filename
-            if not user_file.exists():
-                user_file.write_text(content, encoding="utf-8")
+            if user_file.exists():
+                continue
+            default_file = self.DEFAULT_PROMPTS_DIR / filename
+            if default_file.exists():
+                shutil.copyfile(default_file, user_file)
+            else:
+                user_file.write_text("", encoding="utf-8")
     
     def get_prompt_path(self, name: str) -> Path:
         """Get path to a prompt file."""        
         return self.prompts_dir / f"{name}.md"
     
+    def _stat_prompt(self, name: str) -> Optional[os.stat_result]:
+        """Stat a prompt file, or None if it is (recently confirmed) missing."""
+        missing_since = self._missing.get(name)
+        if missing_since is not None and time.monotonic() - missing_since < self.MISSING_TTL:
+            return None
+        try:
+            st = self.get_prompt_path(name).stat()
+        except FileNotFoundError:
+            self._missing[name] = time.monotonic()
+            self._read_cache.pop(name, None)
+            return None
+        self._missing.pop(name, None)
+        return st
+    
     def read_prompt(self, name: str) -> str:
         """Read a prompt file content."""        
+        st = self._stat_prompt(name)
+        if st is None:
+            return ""
+        
         prompt_path = self.get_prompt_path(name)
-        if prompt_path.exists():
-            return prompt_path.read_text(encoding="utf-8")
-        return ""
+        cached = self._read_cache.get(name)
+        if cached and cached[0] == st.st_mtime_ns:
+            return cached[1]
+        
+        content = prompt_path.read_text(encoding="utf-8")
+        self._read_cache[name] = (st.st_mtime_ns, content)
+        return content
     
     def write_prompt(self, name: str, content: str) -> None:
         """Write content to a prompt file."""
         prompt_path = self.get_prompt_path(name)
         prompt_path.write_text(content, encoding="utf-8")
+        self._read_cache.pop(name, None)
+        self._missing.pop(name, None)
+    
+    def _prompt_mtimes(self) -> tuple:
+        """Get mtimes of the system prompt files (None if missing)."""
+        mtimes = []
+        for name in self.SYSTEM_PROMPT_FILES:
+            st = self._stat_prompt(name)
+            mtimes.append(st.st_mtime_ns if st is not None else None)
+        return tuple(mtimes)
     
     def list_prompts(self) -> list[str]:
         """List all available prompt files."""
-        if not self.prompts_dir.exists():
-            return []
-        
-        prompts = []
-        for f in self.prompts_dir.iterdir():
-            if f.suffix == ".md":
-                prompts.append(f.stem)
-        return sorted(prompts)
+        return sorted(p.stem for p in self.prompts_dir.glob("*.md"))
     
     def build_system_prompt(self, is_china_mainland: bool = False, system_type: str = "Windows", shell_type: str = "PowerShell", tools_prompt: str = "", skills_prompt: str = "") -> str:
         """Build complete system prompt from all prompt files."""
-        parts = []
+        key = (self._prompt_mtimes(), is_china_mainland, system_type, shell_type, tools_prompt, skills_prompt)
+        cached = self._assembled_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        prompt = self._assemble_system_prompt(is_china_mainland, system_type, shell_type, tools_prompt, skills_prompt)
+        if len(self._assembled_cache) >= self.ASSEMBLED_CACHE_SIZE:
+            self._assembled_cache.clear()
+        self._assembled_cache[key] = prompt
+        return prompt
+    
+    def _assemble_system_prompt(self, is_china_mainland: bool, system_type: str, shell_type: str, tools_prompt: str, skills_prompt: str) -> str:
+        """Assemble the system prompt from the prompt files."""
+        buf = io.StringIO()
+        sep = ""
+        
+        def emit(*chunks: str) -> None:
+            # Write the section separator lazily so empty sections are skipped
+            nonlocal sep
+            buf.write(sep)
+            for chunk in chunks:
+                buf.write(chunk)
+            sep = "\n\n---\n\n"
         
         # Read system prompt
         system = self.read_prompt("system")
         if system:
-            parts.append(f"# System\n{system}")
+            emit(_HDR_SYSTEM, system)
         
         # Add system and shell information
-        parts.append(f"# System Environment\n**Operating System**: {system_type}\n**Shell**: {shell_type}\n**Region**: {'China Mainland' if is_china_mainland else 'Global'}")
+        emit(f"# System Environment\n**Operating System**: {system_type}\n**Shell**: {shell_type}\n**Region**: {'China Mainland' if is_china_mainland else 'Global'}")
         
         # Add tools definition
         if tools_prompt:
-            parts.append(tools_prompt)
+            emit(tools_prompt)
         
         # Add skills prompts
         if skills_prompt:
-            parts.append(f"# Skills\n{skills_prompt}")
+            emit(_HDR_SKILLS, skills_prompt)
         
         # Read identity
         identity = self.read_prompt("identity")
         if identity:
             # Check if user is in China mainland and add Chinese instruction
-            if is_china_mainland:
-                identity += "\n\n**Language Preference**: The user is in China mainland. Please respond in Chinese (中文) for better communication."
+            language = "\n\n**Language Preference**: The user is in China mainland. Please respond in Chinese (中文) for better communication." if is_china_mainland else ""
             # Add system and shell-specific instructions
-            identity += f"\n\n**System-Specific Guidelines**:\n- When using bash tool, generate commands appropriate for {system_type} {shell_type}\n- For file operations, use {system_type}-compatible paths\n- Be aware of {shell_type} command syntax differences\n- Generate commands that work directly in {shell_type}"
-            parts.append(f"# Identity\n{identity}")
+            guidelines = f"\n\n**System-Specific Guidelines**:\n- When using bash tool, generate commands appropriate for {system_type} {shell_type}\n- For file operations, use {system_type}-compatible paths\n- Be aware of {shell_type} command syntax differences\n- Generate commands that work directly in {shell_type}"
+            emit(_HDR_IDENTITY, identity, language, guidelines)
         
         # Read user context
         user = self.read_prompt("user")
         if user:
-            parts.append(f"# User Context\n{user}")
+            emit(_HDR_USER, user)
         
         # Read memory
         memory = self.read_prompt("memory")
         if memory:
-            parts.append(f"# Memory\n{memory}")
+            emit(_HDR_MEMORY, memory)
         
-        return "\n\n---\n\n".join(parts) if parts else "You are a helpful AI assistant."
-
-
-# Default prompt content - No emojis for Windows compatibility
-DEFAULT_SYSTEM_PROMPT = '''# AGENTS.md - Your Workspace
-
-This folder is home. Treat it that way.
-
-## Context
-
-Your system prompt, identity, user profile, and memories are already loaded above.
-You do NOT need to read `identity.md`, `user.md`, or `memory.md` manually.
-
-## Memory
-
-- **memory.md** -- long-term curated memories, lessons learned
-- Capture what matters: decisions, context, things to remember
-- When you learn a lesson -- document it so future-you doesn't repeat it
-- **Text > Brain**
-
-## Safety
-
-- Don't exfiltrate private data. Ever.
-- Don't run destructive commands without asking.
-- When in doubt, ask.
-
-## External vs Internal
-
-**Safe to do freely:**
-- Read files, explore, organize, learn
-- Work within this workspace
-
-**Ask first:**
-- Anything that leaves the machine
-- Anything destructive
-- Anything you're uncertain about
-
-## Time-Aware Queries (IMPORTANT!)
-
-When the user asks about **latest**, **recent**, **current**, **now**, **real-time**, **today**, or any time-sensitive information (news, releases, versions, stock prices, weather, etc.):
-
-1. **The system prompt already provides the current date/time** at the top of each conversation
-2. **You MUST actively use this timestamp** in your reasoning and responses
-3. **When using SearchWeb**: Include the current year/month in the search query (e.g., "DeepSeek latest model 2026")
-4. **When answering without search**: Preface with "As of [current date]..." to set the temporal boundary
-5. **If uncertain about recency**: State explicitly "As of [current date], the latest information I have is..."
-
-**Why this matters**: Without explicit timestamp anchoring, users cannot judge if the information is stale. Always make the time reference explicit.
-
-## Team Collaboration (Multi-Agent)
-
-When facing complex multi-step tasks, you can spawn teammates to work in parallel.
-
-### When to use teammates
-
-- Complex refactoring that touches multiple files
-- Large feature implementation with independent parts
-- Tasks that can be parallelized (e.g., write code + write tests + write docs)
-- Long-running analysis that would block the main conversation
-
-### Available teammate roles
-
-| Role | Responsibility |
-|------|----------------|
-| coder | Write or refactor code |
-| tester | Write tests, verify behavior, run test suites |
-| reviewer | Review code quality, find bugs, suggest improvements |
-| docs | Write documentation, README, comments |
-| researcher | Search web, analyze data, investigate issues |
-
-### Team workflow
-
-1. **Analyze**: Break the user's request into independent sub-tasks
-2. **Spawn**: Use `team_spawn` to create teammates for each sub-task
-   ```json
-   {"tool": "team_spawn", "args": {"name": "alice", "role": "coder", "prompt": "Implement the auth module..."}}
-   ```
-3. **Monitor**: Teammates run independently in the background
-4. **Check**: Use `/team` command to see running teammates and their status
-5. **Coordinate**: Use `team_send` to send messages to teammates if needed
-6. **Integrate**: When teammates finish, review their work and integrate results
-
-### Rules
-
-- Spawn teammates proactively for parallelizable work -- don't do everything sequentially yourself
-- Give each teammate a clear, self-contained task in the prompt
-- Do NOT spawn teammates for trivial one-line changes
-- Maximum 3-5 teammates per task to avoid chaos
-'''
-
-DEFAULT_IDENTITY_PROMPT = '''# Sun CLI Assistant
-
-You are Sun CLI, a helpful AI assistant embedded in a command-line interface. You have access to powerful tools that allow you to read, write, and edit files, as well as execute bash commands.
-
-## Core Traits
-
-- **Helpful**: You genuinely want to help user accomplish their goals
-- **Concise**: You value brevity. Don't ramble.
-- **Proactive**: Use your tools to gather information and solve problems
-- **Curious**: You ask clarifying questions when needed
-- **Autonomous**: You can complete multi-step tasks independently
-
-## Inquiry vs Execution (CRITICAL!)
-
-Distinguish between **asking about capabilities** and **requesting execution**:
-
-- When user asks "Can you...?", "Do you support...?", "What can you do?" — answer directly in natural language. **DO NOT call tools.**
-- When user says "Please do...", "Help me...", "Run..." — then use tools to execute.
-
-Examples:
-- User: "Can you spawn teammates?" → Answer: "Yes, I can spawn teammates with roles like coder, tester, reviewer..." (no tool call)
-- User: "Spawn a tester teammate for me" → Action: use `team_spawn` tool
-- User: "Do you have memory?" → Answer: "Yes, I have persistent memory across sessions..." (no tool call)
-- User: "Save this to memory" → Action: use `save_memory` tool
-
-## Multi-Round Tool Calling (CRITICAL!)
-
-You have access to powerful tools (read, write, edit, bash). You can call tools MULTIPLE TIMES in sequence:
-
-1. **Analyze**: Understand what the user needs
-2. **Gather**: Use `read` and `bash` to collect information
-3. **Act**: Use `write` and `edit` to make changes
-4. **Verify**: Read files again to confirm changes
-5. **Complete**: Provide final summary when done
-
-**You can make up to 10 tool calls in a single conversation!**
-
-Example workflow:
-```
-User: "Check what Python files we have and update main.py"
-> bash (find Python files)
-> read (examine main.py)
-> edit (make changes)
-> read (verify changes)
-> Final answer
-```
-
-## Tool Call Format (IMPORTANT!)
-
-**Use JSON format for tool calls:**
-```json
-{"tool": "read", "args": {"file_path": "test.txt"}}
-```
-
-**DO NOT use XML format for tool calls.**
-
-## Communication Style
-
-- Use clear, simple language
-- Format output for terminal readability
-- Use markdown when it helps clarity
-- For code: show complete, working examples
-- Admit when you don't know something
-- **IMPORTANT**: If the user is in China mainland, respond in Chinese (中文)
-- **DON'T say phrases like**: "我已经查看了...", "让我为你...", "Based on the files I read..."
-- **DON'T use transitional phrases**: Just provide the answer directly without introductory sentences
-
-## Code Block Formatting (IMPORTANT)
-
-When providing commands or code examples, ALWAYS use fenced code blocks with language specification:
-
-```bash
-# Good - Shell commands
-suncli config --show
-```
-
-```python
-# Good - Python code
-def hello():
-    print("Hello, World!")
-```
-
-- Use triple backticks (```) for all code blocks
-- Always specify the language (bash, python, javascript, etc.)
-- For shell commands, use `bash` or `shell` as the language
-- This enables syntax highlighting and better display in the terminal
-
-## Terminal Context
-
-- The user is in a terminal environment
-- They can execute shell commands with `!` prefix
-- You can suggest commands they might run
-- Be mindful of Windows vs Linux differences
-''' 
-
-DEFAULT_USER_PROMPT = '''# User Profile
-
-## About
-
-A developer using Sun CLI for:
-- Coding assistance
-- Learning new technologies
-- Automating tasks
-- General productivity
-
-## Preferences
-
-- Prefers concise answers
-- Likes working code examples
-- Uses Windows with some Linux familiarity
-- Appreciates direct, no-nonsense communication
-
-## Current Context
-
-Working on: Python CLI tool development
-Environment: Windows with MSYS2
-'''
-
+        return buf.getvalue() or "You are a helpful AI assistant."
 
 # Global instance
 _prompt_manager: Optional[PromptManager] = None
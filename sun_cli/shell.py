@@ -1,13 +1,26 @@
 """Shell command execution for Sun CLI."""
 
-import subprocess
+import asyncio
+import codecs
 import os
-from pathlib import Path
+import sys
+from typing import Callable, Optional
 
 from rich.console import Console
+from rich.markup import escape
 
+# Output decoders in order of preference, resolved once. gb2312/cp936 are
+# covered by gbk, and latin-1 maps every byte so it never fails.
+_DECODERS = tuple(codecs.getdecoder(encoding) for encoding in ('utf-8', 'gbk', 'latin-1'))
 
-def execute_shell_command(command: str, console: Console) -> int:
+# Read size for subprocess output streams
+_READ_SIZE = 1 << 16
+
+# Home directory, looked up on the first bare `cd`
+_HOME_CACHE: Optional[str] = None
+
+
+async def execute_shell_command(command: str, console: Console) -> int:
     """Execute a shell command and display output.
     
     Args:
@@ -38,52 +51,111 @@ def execute_shell_command(command: str, console: Console) -> int:
         return 0
     
     try:
-        # Execute command and capture output as bytes first
-        result = subprocess.run(
+        # Execute command and stream output as it arrives
+        proc = await asyncio.create_subprocess_shell(
             command,
-            shell=True,
-            capture_output=True,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
         )
         
-        # Try to decode stdout
-        stdout_text = _decode_output(result.stdout)
-        stderr_text = _decode_output(result.stderr)
-        
-        # Print stdout
-        if stdout_text:
-            console.print(stdout_text.rstrip())
+        # stderr is shown once as a single warning block, after stdout
+        _, stderr_data = await asyncio.gather(
+            _stream_output(
+                proc.stdout,
+                lambda text: console.print(text, markup=False),
+                raw=_raw_stdout_writer(console),
+            ),
+            proc.stderr.read(),
+        )
+        returncode = await proc.wait()
         
-        # Print stderr
+        stderr_text = _decode_output(stderr_data).rstrip()
         if stderr_text:
-            console.print(f"[yellow][Warning][/yellow] {stderr_text.rstrip()}")
+            console.print(f"[yellow][Warning][/yellow] {escape(stderr_text)}")
         
         # Show exit code if non-zero
-        if result.returncode != 0:
-            console.print(f"[red]Exit code: {result.returncode}[/red]")
+        if returncode != 0:
+            console.print(f"[red]Exit code: {returncode}[/red]")
         
-        return result.returncode
+        return returncode
         
     except Exception as e:
         console.print(f"[red]Error executing command: {e}[/red]")
         return 1
 
 
+def _raw_stdout_writer(console: Console) -> Optional[Callable[[bytes], None]]:
+    """Get a writer for passing bytes straight to stdout, if the console prints there."""
+    if console.file is not sys.stdout or not hasattr(sys.stdout, "buffer"):
+        return None
+    
+    def write(data: bytes) -> None:
+        sys.stdout.flush()
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
+    
+    return write
+
+
+async def _stream_output(
+    stream: asyncio.StreamReader,
+    emit: Callable[[str], None],
+    raw: Optional[Callable[[bytes], None]] = None,
+) -> None:
+    """Decode and emit a subprocess stream line by line.
+    
+    Output is read in large chunks and split into lines locally, so chatty
+    commands cost few reads and very long lines have no length limit. If
+    raw is given, pure-ASCII blocks are written through it undecoded.
+    """
+    pending = b""
+    while True:
+        chunk = await stream.read(_READ_SIZE)
+        if not chunk:
+            break
+        pending += chunk
+        end = pending.rfind(b"\n")
+        if end == -1:
+            continue
+        block = pending[:end + 1]
+        pending = pending[end + 1:]
+        if raw is not None and block.isascii():
+            raw(block)
+            continue
+        for line in block[:-1].split(b"\n"):
+            emit(_decode_output(line).rstrip("\r"))
+    if pending:
+        if raw is not None and pending.isascii():
+            raw(pending + b"\n")
+        else:
+            emit(_decode_output(pending).rstrip("\r"))
+
+
 def _decode_output(data: bytes) -> str:
-    """Decode byte output trying multiple encodings."""
+    """Decode byte output: UTF-8, then GBK (Chinese Windows), then latin-1."""
     if not data:
         return ""
     
-    # Try encodings in order
-    encodings = ['utf-8', 'gbk', 'gb2312', 'cp936', 'latin-1']
+    # Most command output is plain ASCII
+    if data.isascii():
+        return data.decode('ascii')
     
-    for encoding in encodings:
+    for decode in _DECODERS:
         try:
-            return data.decode(encoding)
-        except (UnicodeDecodeError, LookupError):
+            return decode(data)[0]
+        except UnicodeDecodeError:
             continue
     
-    # Last resort: decode with replace
-    return data.decode('utf-8', errors='replace')
+    # Unreachable: latin-1 maps every byte
+    return data.decode('latin-1')
+
+
+def _get_home() -> str:
+    """Get the (cached) home directory."""
+    global _HOME_CACHE
+    if _HOME_CACHE is None:
+        _HOME_CACHE = os.path.expanduser("~")
+    return _HOME_CACHE
 
 
 def _handle_cd(path: str, console: Console) -> int:
@@ -91,31 +163,29 @@ def _handle_cd(path: str, console: Console) -> int:
     try:
         if not path:
             # cd without args goes to home directory
-            path = str(Path.home())
+            path = _get_home()
         
-        # Expand user (~) using Path, expand vars using os
-        path = os.path.expandvars(path)
-        path = Path(path).expanduser()
+        # Expand vars and user (~)
+        path = os.path.expanduser(os.path.expandvars(path))
         
         # Handle "-" to go to previous directory
-        if str(path) == "-":
+        if path == "-":
             old_cwd = os.environ.get('OLDPWD', '')
             if old_cwd:
-                path = Path(old_cwd)
+                path = old_cwd
             else:
                 console.print("[red]No previous directory[/red]")
                 return 1
         
         # Save current directory before changing
-        os.environ['OLDPWD'] = str(Path.cwd())
+        old_cwd = os.getcwd()
         
-        # Change directory
-        target = path.resolve()
-        target.mkdir(parents=True, exist_ok=True)
-        os.chdir(target)
+        # Change directory (fails like POSIX cd if it doesn't exist)
+        os.chdir(path)
+        os.environ['OLDPWD'] = old_cwd
         
         # Show new directory
-        console.print(f"[dim]{Path.cwd()}[/dim]")
+        console.print(f"[dim]{os.getcwd()}[/dim]")
         return 0
         
     except Exception as e:
@@ -145,7 +215,19 @@ def extract_command(user_input: str) -> str:
     Returns:
         The command without ! prefix
     """
-    stripped = user_input.strip()
+    return user_input.lstrip()[1:].strip()
+
+
+def parse_shell_command(user_input: str) -> Optional[str]:
+    """Return the command if user input is a shell command (starts with !).
+    
+    Args:
+        user_input: Raw user input
+        
+    Returns:
+        The command without ! prefix, or None if it isn't a shell command
+    """
+    stripped = user_input.lstrip()
     if stripped.startswith('!'):
         return stripped[1:].strip()
-    return stripped
+    return None
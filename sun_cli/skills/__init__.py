@@ -5,7 +5,7 @@ This module provides two complementary skill systems:
 2. Procedural Library: Experience playbooks created and maintained by the Agent itself
 """
 
-from .skill import Skill, SkillContext, SkillManager, get_skill_manager
+from .skill import Skill, SkillContext, SkillManager, compile_keywords, get_skill_manager
 from .entry import SkillEntry
 from .library import SkillLibrary, get_skill_library
 from .handlers import handle_skill_view, handle_skill_manage, SKILL_VIEW_SCHEMA, SKILL_MANAGE_SCHEMA
@@ -16,6 +16,7 @@ __all__ = [
     "SkillContext",
     "SkillManager",
     "get_skill_manager",
+    "compile_keywords",
     # Procedural memory (Self-Improving)
     "SkillEntry",
     "SkillLibrary",
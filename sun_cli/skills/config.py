@@ -1,7 +1,8 @@
 """Config management skill for Sun CLI."""
 
+import re
 from typing import Optional
-from ..skills import Skill, SkillContext
+from ..skills import Skill, SkillContext, compile_keywords
 from ..config import get_config, get_config_dir
 from rich.panel import Panel
 
@@ -9,6 +10,10 @@ from rich.panel import Panel
 class ConfigSkill(Skill):
     """Config management skill."""
     
+    # Checked in order; the first match handles the input
+    _SHOW_RE = compile_keywords("查看配置", "show config", "/config")
+    _HELP_RE = compile_keywords("配置", "设置", "config")
+    
     @property
     def name(self) -> str:
         return "config"
@@ -45,14 +50,17 @@ Recommended AI services for Chinese users:
         super().initialize(context)
         self.config = get_config()
     
+    @property
+    def trigger_pattern(self) -> Optional[re.Pattern]:
+        # Every show phrase also contains a help phrase
+        return self._HELP_RE
+    
     async def handle(self, user_input: str) -> bool:
-        lower_input = user_input.lower()
-        
-        if "查看配置" in lower_input or "show config" in lower_input or "/config" in lower_input:
+        if self._SHOW_RE.search(user_input):
             self._show_config()
             return True
         
-        if "配置" in lower_input or "设置" in lower_input or "config" in lower_input:
+        if self._HELP_RE.search(user_input):
             self._show_config_help()
             return True
         
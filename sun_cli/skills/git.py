@@ -1,15 +1,45 @@
 """Git workflow skill for Sun CLI."""
 
+import asyncio
+import re
+from functools import cached_property
 from typing import Optional
-from ..skills import Skill, SkillContext
-from ..git_helper import GitHelper, detect_commit_intent
+
+from ..skills import Skill, SkillContext, compile_keywords
+from ..git_helper import COMMIT_KEYWORDS, GitHelper
 from ..conflict_resolver import ConflictResolver, show_conflict_summary
 from ..config import get_config
-from ..notification import get_notification_manager
+from ..notification import NotificationManager, get_notification_manager
+from ..utils.http import get_llm_client, stream_chat_completion
 from rich.panel import Panel
 from rich.prompt import Confirm
 
 
+# Same phrases detect_commit_intent looks for
+_COMMIT_TRIGGER_RE = compile_keywords(*COMMIT_KEYWORDS)
+
+
+# Commit message prompt; filled in with str.format
+_COMMIT_PROMPT = """请根据以下代码变更生成一个简洁、规范的 Git 提交信息。
+
+要求：
+1. 使用 Conventional Commits 格式（如 feat:, fix:, docs:, refactor: 等）
+2. 标题不超过 50 个字符，简洁明了
+3. 如有需要，可添加简要描述（可选）
+4. 只返回提交信息，不要其他解释
+5. 使用中文或英文，保持与代码变更相关
+
+最近的提交记录（供参考风格）：
+{recent}
+
+代码变更（diff）：
+```diff
+{diff}
+```
+
+请生成提交信息："""
+
+
 class GitSkill(Skill):
     """Smart Git workflow skill."""
     
@@ -44,13 +74,30 @@ The workflow handles all steps automatically with user confirmation.
     
     def initialize(self, context: SkillContext) -> None:
         super().initialize(context)
-        self.git = GitHelper(self.context.console)
-        self.resolver = ConflictResolver(self.context.console, self.git)
         self.config = get_config()
-        self.notification = get_notification_manager(self.context.console)
+        # Helpers are built on first use; drop any bound to an earlier context
+        for attr in ("git", "resolver", "notification"):
+            self.__dict__.pop(attr, None)
+    
+    @cached_property
+    def git(self) -> GitHelper:
+        return GitHelper(self.context.console)
+    
+    @cached_property
+    def resolver(self) -> ConflictResolver:
+        return ConflictResolver(self.context.console, self.git)
+    
+    @cached_property
+    def notification(self) -> NotificationManager:
+        return get_notification_manager(self.context.console)
+    
+    @property
+    def trigger_pattern(self) -> Optional[re.Pattern]:
+        return _COMMIT_TRIGGER_RE
     
     async def handle(self, user_input: str) -> bool:
-        if not detect_commit_intent(user_input):
+        # Same check as detect_commit_intent, without lowercasing a copy
+        if not _COMMIT_TRIGGER_RE.search(user_input):
             return False
         
         if not self.git.is_git_repo():
@@ -72,12 +119,15 @@ The workflow handles all steps automatically with user confirmation.
         ))
         
         # 第一步：检查并暂存本地更改
-        status = self.git.get_status()
+        status = await self.git.get_status_async()
+        # 只有在仓库被修改后才需要重新获取状态
+        status_stale = False
         
         if status.has_conflicts:
             self.context.console.print("[red]当前存在未解决的冲突，请先解决[/red]")
             if self.resolver.resolve_all(status.conflicted_files):
                 self.context.console.print("[green]所有冲突已解决[/green]")
+                status_stale = True
             else:
                 return
         
@@ -86,18 +136,21 @@ The workflow handles all steps automatically with user confirmation.
             self.context.console.print("[dim]正在暂存本地更改...[/dim]")
             self.git.stage_all()
             self.context.console.print("[green][OK] 已暂存所有更改[/green]")
+            status_stale = True
         
         # 第二步：拉取远程代码
-        success, message = self.git.pull(rebase=True)
+        success, message = await asyncio.to_thread(self.git.pull, True)
         
         if not success:
             if message == "conflict":
-                status = self.git.get_status()
+                status = await self.git.get_status_async()
+                status_stale = False
                 if status.conflicted_files:
                     show_conflict_summary(self.context.console, status.conflicted_files)
                 
                     if self.resolver.resolve_all(status.conflicted_files):
                         self.context.console.print("[green]冲突已解决，继续提交流程[/green]")
+                        status_stale = True
                     else:
                         self.context.console.print("[yellow]提交已中止，请解决冲突后重试[/yellow]")
                         return
@@ -106,11 +159,13 @@ The workflow handles all steps automatically with user confirmation.
                 self.context.console.print(f"[yellow]拉取提醒: {message}[/yellow]")
                 self.context.console.print("[dim]将继续提交本地更改...[/dim]")
         else:
+            status_stale = True
             if message:
                 self.context.console.print(f"[dim]{message}[/dim]")
         
         # 第三步：检查是否有更改需要提交
-        status = self.git.get_status()
+        if status_stale:
+            status = await self.git.get_status_async()
         
         if not status.has_changes and not status.ahead:
             self.context.console.print("[dim]没有需要提交的更改[/dim]")
@@ -143,7 +198,7 @@ The workflow handles all steps automatically with user confirmation.
         
         self.context.console.print("[green]提交成功[/green]")
         
-        success, message = self.git.push()
+        success, message = await asyncio.to_thread(self.git.push)
         if success:
             self.context.console.print("[green]推送成功[/green]")
             self.notification.notify_success("代码已成功推送到远程仓库")
@@ -151,53 +206,55 @@ The workflow handles all steps automatically with user confirmation.
             self.context.console.print(f"[red]推送失败: {message}[/red]")
     
     async def _generate_commit_message(self) -> Optional[str]:
-        import httpx
-        
-        diff = self.git.get_staged_diff()
+        # Independent git reads; run them side by side off the event loop.
+        # One line past the limit is enough to tell whether to truncate.
+        diff, recent_commits = await asyncio.gather(
+            asyncio.to_thread(self.git.get_staged_diff_head, 151),
+            asyncio.to_thread(self.git.get_recent_commits, 3),
+        )
         if not diff:
             return None
         
-        recent_commits = self.git.get_recent_commits(3)
         formatted_diff = self._format_diff_for_ai(diff, max_lines=150)
         prompt = self._build_commit_prompt(formatted_diff, recent_commits)
         
         try:
             self.context.console.print("[dim]正在生成提交信息...[/dim]")
             
-            async with httpx.AsyncClient(
-                base_url=self.config.base_url,
-                headers={
-                    "Authorization": f"Bearer {self.config.api_key}",
-                    "Content-Type": "application/json",
+            streamed = False
+            
+            def show_delta(delta: str) -> None:
+                # Show the message as it is generated
+                nonlocal streamed
+                streamed = True
+                self.context.console.print(delta, end="", style="dim", markup=False, highlight=False)
+            
+            commit_msg = await stream_chat_completion(
+                get_llm_client(self.config),
+                {
+                    "model": self.config.model,
+                    "messages": [
+                        {"role": "system", "content": "You are a Git expert. Generate concise, conventional commit messages."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    "temperature": 0.3,
+                    "max_tokens": 200,
                 },
-                timeout=60.0,
-            ) as client:
-                response = await client.post(
-                    "/chat/completions",
-                    json={
-                        "model": self.config.model,
-                        "messages": [
-                            {"role": "system", "content": "You are a Git expert. Generate concise, conventional commit messages."},
-                            {"role": "user", "content": prompt}
-                        ],
-                        "temperature": 0.3,
-                        "max_tokens": 200,
-                    },
-                )
-                response.raise_for_status()
-                
-                data = response.json()
-                commit_msg = data["choices"][0]["message"]["content"] or ""
+                on_delta=show_delta,
+            )
+            if streamed:
+                self.context.console.print()
             
             commit_msg = commit_msg.strip()
             
             if commit_msg.startswith("```"):
-                lines = commit_msg.splitlines()
-                if lines[0].startswith("```"):
-                    lines = lines[1:]
-                if lines and lines[-1].startswith("```"):
-                    lines = lines[:-1]
-                commit_msg = "\n".join(lines).strip()
+                # Drop the opening fence line, then a closing fence line if any
+                newline = commit_msg.find("\n")
+                commit_msg = commit_msg[newline + 1:] if newline >= 0 else ""
+                last_line = commit_msg.rfind("\n") + 1
+                if commit_msg.startswith("```", last_line):
+                    commit_msg = commit_msg[:last_line]
+                commit_msg = commit_msg.strip()
             
             if len(commit_msg) > 100:
                 first_line = commit_msg.split("\n")[0]
@@ -212,30 +269,18 @@ The workflow handles all steps automatically with user confirmation.
             return "update: code changes"
     
     def _format_diff_for_ai(self, diff: str, max_lines: int = 150) -> str:
-        lines = diff.splitlines()
-        if len(lines) > max_lines:
-            lines = lines[:max_lines]
-            lines.append("... (diff truncated)")
-        return "\n".join(lines)
+        # Find the end of line max_lines without splitting the whole diff
+        end = 0
+        for _ in range(max_lines):
+            newline = diff.find("\n", end)
+            if newline == -1:
+                break
+            end = newline + 1
+        else:
+            if end < len(diff):
+                return diff[:end] + "... (diff truncated)"
+        return diff[:-1] if diff.endswith("\n") else diff
     
     def _build_commit_prompt(self, diff: str, recent_commits: list[str]) -> str:
         recent_commits_str = "\n".join(f"- {c}" for c in recent_commits) if recent_commits else "无"
-        
-        return f"""请根据以下代码变更生成一个简洁、规范的 Git 提交信息。
-
-要求：
-1. 使用 Conventional Commits 格式（如 feat:, fix:, docs:, refactor: 等）
-2. 标题不超过 50 个字符，简洁明了
-3. 如有需要，可添加简要描述（可选）
-4. 只返回提交信息，不要其他解释
-5. 使用中文或英文，保持与代码变更相关
-
-最近的提交记录（供参考风格）：
-{recent_commits_str}
-
-代码变更（diff）：
-```diff
-{diff}
-```
-
-请生成提交信息："""
+        return _COMMIT_PROMPT.format(recent=recent_commits_str, diff=diff)
@@ -1,7 +1,8 @@
 """Prompt management skill for Sun CLI."""
 
+import re
 from typing import Optional
-from ..skills import Skill, SkillContext
+from ..skills import Skill, SkillContext, compile_keywords
 from ..prompts import get_prompt_manager
 from rich.panel import Panel
 
@@ -9,6 +10,15 @@ from rich.panel import Panel
 class PromptSkill(Skill):
     """Prompt management skill."""
     
+    # Checked in order; the first match handles the input
+    _HELP_RE = compile_keywords("编辑提示词", "修改提示词", "edit prompt")
+    _SHOW_RE = compile_keywords("查看提示词", "show prompt")
+    _EDIT_RE = re.compile(r"(?:修改|edit) (identity|system|user|memory)", re.IGNORECASE)
+    _EDIT_ORDER = ("identity", "system", "user", "memory")
+    _TRIGGER_RE = re.compile(
+        "|".join(pattern.pattern for pattern in (_HELP_RE, _SHOW_RE, _EDIT_RE)), re.IGNORECASE
+    )
+    
     @property
     def name(self) -> str:
         return "prompt"
@@ -41,32 +51,24 @@ Users can edit these files to customize your behavior.
         super().initialize(context)
         self.pm = get_prompt_manager()
     
+    @property
+    def trigger_pattern(self) -> Optional[re.Pattern]:
+        return self._TRIGGER_RE
+    
     async def handle(self, user_input: str) -> bool:
-        lower_input = user_input.lower()
-        
-        if "编辑提示词" in lower_input or "修改提示词" in lower_input or "edit prompt" in lower_input:
+        if self._HELP_RE.search(user_input):
             self._show_prompt_help()
             return True
         
-        if "查看提示词" in lower_input or "show prompt" in lower_input:
+        if self._SHOW_RE.search(user_input):
             self._show_current_prompt()
             return True
         
-        if "修改 identity" in lower_input or "edit identity" in lower_input:
-            self._edit_prompt("identity")
-            return True
-        
-        if "修改 system" in lower_input or "edit system" in lower_input:
-            self._edit_prompt("system")
-            return True
-        
-        if "修改 user" in lower_input or "edit user" in lower_input:
-            self._edit_prompt("user")
-            return True
-        
-        if "修改 memory" in lower_input or "edit memory" in lower_input:
-            self._edit_prompt("memory")
-            return True
+        targets = {m.group(1).lower() for m in self._EDIT_RE.finditer(user_input)}
+        for name in self._EDIT_ORDER:
+            if name in targets:
+                self._edit_prompt(name)
+                return True
         
         return False
     
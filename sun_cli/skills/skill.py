@@ -1,11 +1,17 @@
 """Skill framework for Sun CLI - modular extension system."""
 
+import re
 from abc import ABC, abstractmethod
 from typing import Optional, Dict, Any
 from dataclasses import dataclass
 from rich.console import Console
 
 
+def compile_keywords(*keywords: str) -> re.Pattern:
+    """Compile literal keywords into one case-insensitive alternation."""
+    return re.compile("|".join(re.escape(keyword) for keyword in keywords), re.IGNORECASE)
+
+
 @dataclass
 class SkillContext:
     """Context passed to skills."""
@@ -43,6 +49,19 @@ class Skill(ABC):
         """Initialize the skill with context."""
         self.context = context
     
+    @property
+    def trigger_pattern(self) -> Optional[re.Pattern]:
+        """Pattern any input handled by this skill must contain.
+        
+        None means the skill may handle anything, so it is always tried.
+        """
+        return None
+    
+    def matches(self, user_input: str) -> bool:
+        """Cheap check whether handle() might accept the input."""
+        pattern = self.trigger_pattern
+        return pattern is None or pattern.search(user_input) is not None
+    
     @abstractmethod
     async def handle(self, user_input: str) -> bool:
         """
@@ -64,10 +83,18 @@ class SkillManager:
     def __init__(self):
         self._skills: Dict[str, Skill] = {}
         self._context: Optional[SkillContext] = None
+        # Derived from the registered skills; reset by register()
+        self._prompts_cache: Optional[str] = None
+        self._help_cache: Optional[str] = None
+        self._trigger_re: Optional[re.Pattern] = None
+        self._trigger_re_built = False
     
     def register(self, skill: Skill) -> None:
         """Register a skill."""
         self._skills[skill.name] = skill
+        self._prompts_cache = None
+        self._help_cache = None
+        self._trigger_re_built = False
     
     def initialize(self, context: SkillContext) -> None:
         """Initialize all skills with context."""
@@ -82,11 +109,35 @@ class SkillManager:
         Returns:
             True if any skill handled the input, False otherwise
         """
+        # One scan over all skills' triggers rejects ordinary chat input
+        trigger_re = self._get_trigger_re()
+        if trigger_re is not None and not trigger_re.search(user_input):
+            return False
+        
+        # Skills run one at a time in registration order: handlers print and
+        # prompt, so only the first one that accepts the input may act.
         for skill in self._skills.values():
-            if await skill.handle(user_input):
+            if skill.matches(user_input) and await skill.handle(user_input):
                 return True
         return False
     
+    def _get_trigger_re(self) -> Optional[re.Pattern]:
+        """Combine every skill's trigger pattern into one alternation.
+        
+        Returns None if any skill has no trigger pattern (it must always run).
+        """
+        if not self._trigger_re_built:
+            patterns = [skill.trigger_pattern for skill in self._skills.values()]
+            if patterns and all(pattern is not None for pattern in patterns):
+                self._trigger_re = re.compile(
+                    "|".join(f"(?:{pattern.pattern})" for pattern in patterns),
+                    re.IGNORECASE,
+                )
+            else:
+                self._trigger_re = None
+            self._trigger_re_built = True
+        return self._trigger_re
+    
     def get_skill(self, name: str) -> Optional[Skill]:
         """Get skill by name."""
         return self._skills.get(name)
@@ -97,17 +148,25 @@ class SkillManager:
     
     def get_all_system_prompts(self) -> str:
         """Get all skill system prompts combined."""
-        prompts = []
-        for skill in self._skills.values():
-            if skill.system_prompt:
-                prompts.append(f"## {skill.name}\n{skill.system_prompt}")
-        return "\n\n".join(prompts) if prompts else ""
+        if self._prompts_cache is None:
+            prompts = []
+            for skill in self._skills.values():
+                system_prompt = skill.system_prompt
+                if system_prompt:
+                    prompts.append(f"## {skill.name}\n{system_prompt}")
+            self._prompts_cache = "\n\n".join(prompts)
+        return self._prompts_cache
     
     def get_help_text(self) -> str:
         """Get help text for all skills."""
         if not self._skills:
             return "No skills registered."
-        
+        if self._help_cache is None:
+            self._help_cache = self._build_help_text()
+        return self._help_cache
+    
+    def _build_help_text(self) -> str:
+        """Build help text for all skills."""
         lines = ["[bold]Available Skills:[/bold]"]
         for skill in self._skills.values():
             lines.append(f"  [cyan]{skill.name}[/cyan]: {skill.description}")
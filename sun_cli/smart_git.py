@@ -9,10 +9,29 @@ from rich.panel import Panel
 from rich.prompt import Confirm
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
-from .git_helper import GitHelper, GitStatus, format_diff_for_ai, detect_commit_intent
+from .git_helper import GitHelper, GitStatus, detect_commit_intent
 from .conflict_resolver import ConflictResolver, show_conflict_summary
 from .config import get_config
 from .notification import get_notification_manager
+from .utils.http import get_llm_client, stream_chat_completion
+
+
+# Commit message requests in flight, keyed by (base_url, model, prompt).
+# Workflows that ask for the same staged diff at once share one completion.
+_pending_messages: dict[tuple, asyncio.Task] = {}
+
+# Longer subjects are cut to their first 97 chars + "..."
+_MAX_COMMIT_SUBJECT = 100
+
+
+def _subject_too_long(text: str) -> bool:
+    """Check whether an unfenced reply's first line is complete and over the limit.
+    
+    Once it is, the rest of the reply would be discarded anyway.
+    """
+    text = text.lstrip()
+    return text.find("\n") > _MAX_COMMIT_SUBJECT and not text.startswith("```")
+
 
 
 class SmartGitWorkflow:
@@ -52,12 +71,15 @@ class SmartGitWorkflow:
         ))
         
         # Step 1: Check current status
-        status = self.git.get_status()
+        status = await self.git.get_status_async()
+        # Only re-read the status after something has changed the repo
+        status_stale = False
         
         if status.has_conflicts:
             self.console.print("[red]当前存在未解决的冲突，请先解决[/red]")
             if self.resolver.resolve_all(status.conflicted_files):
                 self.console.print("[green]所有冲突已解决[/green]")
+                status_stale = True
             else:
                 return
         
@@ -67,12 +89,14 @@ class SmartGitWorkflow:
         if not success:
             if message == "conflict":
                 # Check for new conflicts after pull
-                status = self.git.get_status()
+                status = await self.git.get_status_async()
+                status_stale = False
                 if status.conflicted_files:
                     show_conflict_summary(self.console, status.conflicted_files)
                     
                     if self.resolver.resolve_all(status.conflicted_files):
                         self.console.print("[green]冲突已解决，继续提交流程[/green]")
+                        status_stale = True
                         # Continue with commit
                     else:
                         self.console.print("[yellow]提交已中止，请解决冲突后重试[/yellow]")
@@ -81,10 +105,12 @@ class SmartGitWorkflow:
                 self.console.print(f"[red]拉取失败: {message}[/red]")
                 return
         else:
+            status_stale = True
             self.console.print(f"[dim]{message}[/dim]")
         
         # Step 3: Stage all changes if needed
-        status = self.git.get_status()
+        if status_stale:
+            status = await self.git.get_status_async()
         
         if not status.has_changes and not status.ahead:
             self.console.print("[dim]没有需要提交的更改[/dim]")
@@ -131,19 +157,14 @@ class SmartGitWorkflow:
     
     async def _generate_commit_message(self) -> Optional[str]:
         """Generate commit message using AI."""
-        import httpx
-        
-        # Get diff
-        diff = self.git.get_staged_diff()
-        if not diff:
+        # Get diff (limited in size before decoding)
+        formatted_diff = self.git.get_staged_diff(max_lines=150)
+        if not formatted_diff:
             return None
         
         # Get recent commits for context
         recent_commits = self.git.get_recent_commits(3)
         
-        # Format diff (limit size)
-        formatted_diff = format_diff_for_ai(diff, max_lines=150)
-        
         # Build prompt for AI
         prompt = self._build_commit_prompt(formatted_diff, recent_commits)
         
@@ -151,48 +172,26 @@ class SmartGitWorkflow:
         try:
             self.console.print("[dim]正在生成提交信息...[/dim]")
             
-            async with httpx.AsyncClient(
-                base_url=self.config.base_url,
-                headers={
-                    "Authorization": f"Bearer {self.config.api_key}",
-                    "Content-Type": "application/json",
-                },
-                timeout=60.0,
-            ) as client:
-                response = await client.post(
-                    "/chat/completions",
-                    json={
-                        "model": self.config.model,
-                        "messages": [
-                            {"role": "system", "content": "You are a Git expert. Generate concise, conventional commit messages."},
-                            {"role": "user", "content": prompt}
-                        ],
-                        "temperature": 0.3,
-                        "max_tokens": 200,
-                    },
-                )
-                response.raise_for_status()
-                
-                data = response.json()
-                commit_msg = data["choices"][0]["message"]["content"] or ""
+            commit_msg = await self._request_commit_message(prompt)
             
             # Clean the response
             commit_msg = commit_msg.strip()
             
             # Remove code blocks if present
             if commit_msg.startswith("```"):
-                lines = commit_msg.splitlines()
-                if lines[0].startswith("```"):
-                    lines = lines[1:]
-                if lines and lines[-1].startswith("```"):
-                    lines = lines[:-1]
-                commit_msg = "\n".join(lines).strip()
+                # Drop the opening fence line, then a closing fence line if any
+                newline = commit_msg.find("\n")
+                commit_msg = commit_msg[newline + 1:] if newline >= 0 else ""
+                last_line = commit_msg.rfind("\n") + 1
+                if commit_msg.startswith("```", last_line):
+                    commit_msg = commit_msg[:last_line]
+                commit_msg = commit_msg.strip()
             
             # Limit length
-            if len(commit_msg) > 100:
+            if len(commit_msg) > _MAX_COMMIT_SUBJECT:
                 # Try to get just the first line (subject)
                 first_line = commit_msg.split("\n")[0]
-                if len(first_line) > 100:
+                if len(first_line) > _MAX_COMMIT_SUBJECT:
                     first_line = first_line[:97] + "..."
                 commit_msg = first_line
             
@@ -203,6 +202,43 @@ class SmartGitWorkflow:
             # Fallback to a default message
             return "update: code changes"
     
+    async def _request_commit_message(self, prompt: str) -> str:
+        """Get a completion for prompt, joining an identical request in flight."""
+        key = (self.config.base_url, self.config.model, prompt)
+        task = _pending_messages.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._post_commit_prompt(prompt))
+            _pending_messages[key] = task
+            task.add_done_callback(lambda _: _pending_messages.pop(key, None))
+        # Shield so one caller giving up doesn't cancel the others
+        return await asyncio.shield(task)
+    
+    async def _post_commit_prompt(self, prompt: str) -> str:
+        """Stream the commit prompt's completion, echoing it as it arrives."""
+        parts: list[str] = []
+        
+        def show_delta(delta: str) -> bool:
+            parts.append(delta)
+            self.console.print(delta, end="", style="dim", markup=False, highlight=False)
+            return "\n" in delta and _subject_too_long("".join(parts))
+        
+        commit_msg = await stream_chat_completion(
+            get_llm_client(self.config),
+            {
+                "model": self.config.model,
+                "messages": [
+                    {"role": "system", "content": "You are a Git expert. Generate concise, conventional commit messages."},
+                    {"role": "user", "content": prompt}
+                ],
+                "temperature": 0.3,
+                "max_tokens": 200,
+            },
+            on_delta=show_delta,
+        )
+        if parts:
+            self.console.print()
+        return commit_msg
+    
     def _build_commit_prompt(self, diff: str, recent_commits: list[str]) -> str:
         """Build prompt for commit message generation."""
         recent_commits_str = "\n".join(f"- {c}" for c in recent_commits) if recent_commits else "无"
@@ -45,6 +45,7 @@ When finished, end with a summary paragraph starting with "SUMMARY:"."""
         """
         self.client = client
         self.config = config
+        self.executor = ToolExecutor()
         
     async def run(
         self, 
@@ -99,13 +100,16 @@ When finished, end with a summary paragraph starting with "SUMMARY:"."""
             # Execute tool calls
             messages.append({"role": "assistant", "content": response})
             
+            # Filter to allowed tools; those run together so reads can overlap
+            allowed_calls = [call for call in tool_calls if call.name in allowed_tools]
+            outputs = iter(await self.executor.execute_all(allowed_calls))
+            
             results = []
             for call in tool_calls:
-                # Filter to allowed tools
                 if call.name not in allowed_tools:
                     result = f"Error: Tool '{call.name}' not allowed. Allowed: {allowed_tools}"
                 else:
-                    result = ToolExecutor.execute(call)
+                    result = next(outputs)
                     tool_calls_made.append(call.to_string())
                 
                 results.append({
@@ -1,11 +1,20 @@
 """Core tools for Sun CLI - read, write, edit, bash with sandbox (s02)."""
 
+import asyncio
+import codecs
+import contextvars
+import mmap
 import os
+import shlex
+import shutil
+import signal
 import subprocess
 import locale
+import threading
+import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import IO, Callable, Optional, Tuple
 
 from .sandbox import safe_path, SandboxError
 
@@ -18,6 +27,60 @@ class ToolResult:
     error: Optional[str] = None
 
 
+# read_file returns at most this many characters
+MAX_READ_CHARS = 50000
+
+# Files larger than this are memory-mapped and decoded only as far as needed
+MMAP_READ_THRESHOLD = 1 << 20
+_MMAP_CHUNK = 1 << 18
+
+
+def _read_lines_mapped(path: Path, offset: int, limit: Optional[int]) -> str:
+    """Read the requested lines of a large file through mmap.
+    
+    Decodes incrementally and stops once ``limit`` lines, or just over
+    ``MAX_READ_CHARS`` characters, have been collected. The result matches
+    ``read_text`` + ``splitlines`` after read_file's truncation.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    lines: list[str] = []
+    size = -1  # length of "\n".join(lines)
+    skip = offset
+    pending = ""
+    
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for start in range(0, len(mm) + 1, _MMAP_CHUNK):
+            final = start + _MMAP_CHUNK > len(mm)
+            buf = pending + decoder.decode(mm[start:start + _MMAP_CHUNK], final)
+            pending = ""
+            if not final and buf:
+                # Hold back a trailing partial line (or a "\r" that may precede "\n")
+                last = buf.splitlines(keepends=True)[-1]
+                if last.endswith("\r") or last.splitlines()[0] == last:
+                    pending = last
+                    buf = buf[:-len(last)]
+            
+            for line in buf.splitlines():
+                if skip:
+                    skip -= 1
+                    continue
+                lines.append(line)
+                size += len(line) + 1
+                if (limit and len(lines) >= limit) or size > MAX_READ_CHARS:
+                    return "\n".join(lines)
+            
+            if skip:
+                # The held-back line will be skipped too; only whether it ends
+                # in "\r" matters, so don't carry (and re-split) its text
+                pending = pending[-1:]
+            # A single huge line: its head is all that can be returned
+            elif size + 1 + len(pending) > MAX_READ_CHARS + 1:
+                lines.append(pending)
+                return "\n".join(lines)
+    
+    return "\n".join(lines)
+
+
 def read_file(file_path: str, limit: int = None, offset: int = None) -> ToolResult:
     """Read file content with sandbox protection.
     
@@ -71,22 +134,29 @@ def read_file(file_path: str, limit: int = None, offset: int = None) -> ToolResu
                     )
                 )
         
-        content = path.read_text(encoding="utf-8")
-        lines = content.splitlines()
-        
-        # Apply offset
-        if offset and offset > 0:
-            lines = lines[offset:]
-            
-        # Apply limit
-        if limit and limit > 0:
-            lines = lines[:limit]
+        if path.stat().st_size > MMAP_READ_THRESHOLD:
+            content = _read_lines_mapped(
+                path,
+                offset if offset and offset > 0 else 0,
+                limit if limit and limit > 0 else None,
+            )
+        else:
+            content = path.read_text(encoding="utf-8")
+            lines = content.splitlines()
             
-        content = "\n".join(lines)
+            # Apply offset
+            if offset and offset > 0:
+                lines = lines[offset:]
+                
+            # Apply limit
+            if limit and limit > 0:
+                lines = lines[:limit]
+                
+            content = "\n".join(lines)
         
         # Truncate if too large (>50KB)
-        if len(content) > 50000:
-            content = content[:50000] + "\n\n[Content truncated at 50000 chars]"
+        if len(content) > MAX_READ_CHARS:
+            content = content[:MAX_READ_CHARS] + f"\n\n[Content truncated at {MAX_READ_CHARS} chars]"
             
         return ToolResult(success=True, content=content)
     except SandboxError as e:
@@ -121,7 +191,7 @@ def edit_file(file_path: str, old_str: str, new_str: str) -> ToolResult:
     
     Args:
         file_path: Path to the file to edit
-        old_str: String to search for (must be exact match)
+        old_str: String to search for (must be an exact, unique match)
         new_str: String to replace with
         
     Returns:
@@ -129,7 +199,10 @@ def edit_file(file_path: str, old_str: str, new_str: str) -> ToolResult:
     """
     try:
         path = safe_path(file_path)
-        if not path.exists():
+        try:
+            # One handle for both the read and the rewrite
+            f = open(path, "r+", encoding="utf-8")
+        except FileNotFoundError:
             return ToolResult(
                 success=False,
                 content="",
@@ -140,21 +213,34 @@ def edit_file(file_path: str, old_str: str, new_str: str) -> ToolResult:
                 )
             )
 
-        content = path.read_text(encoding="utf-8")
+        with f:
+            content = f.read()
 
-        if old_str not in content:
-            return ToolResult(
-                success=False,
-                content="",
-                error=(
-                    f"String not found in file: {old_str[:50]}...\n"
-                    f"Correction: Use `read` tool to get the exact current file content, "
-                    f"then copy-paste the exact text (including whitespace) into old_str."
+            index = content.find(old_str)
+            if index < 0:
+                return ToolResult(
+                    success=False,
+                    content="",
+                    error=(
+                        f"String not found in file: {old_str[:50]}...\n"
+                        f"Correction: Use `read` tool to get the exact current file content, "
+                        f"then copy-paste the exact text (including whitespace) into old_str."
+                    )
                 )
-            )
-        
-        new_content = content.replace(old_str, new_str)
-        path.write_text(new_content, encoding="utf-8")
+            if content.find(old_str, index + 1) != -1:
+                return ToolResult(
+                    success=False,
+                    content="",
+                    error=(
+                        f"String appears more than once in file: {old_str[:50]}...\n"
+                        f"Correction: Include more surrounding lines in old_str "
+                        f"so that it matches exactly one location."
+                    )
+                )
+            
+            f.seek(0)
+            f.write(content[:index] + new_str + content[index + len(old_str):])
+            f.truncate()
         return ToolResult(success=True, content=f"Edited {file_path}")
     except SandboxError as e:
         return ToolResult(success=False, content="", error=str(e))
@@ -215,6 +301,146 @@ def _normalize_windows_command(command: str) -> str:
     return cmd
 
 
+# Anything that needs a real shell: pipes, redirection, expansion, globbing, comments
+_SHELL_METACHARS = frozenset("|&;<>()$`\\*?[]{}~#!\n")
+
+
+def _direct_argv(command: str) -> Optional[list[str]]:
+    """Split a simple command into argv so it can run without ``/bin/sh -c``.
+    
+    Returns None when the command uses shell syntax, or its program is not an
+    executable on PATH (builtins, aliases, ``VAR=value cmd``, relative paths).
+    """
+    if not _SHELL_METACHARS.isdisjoint(command):
+        return None
+    try:
+        argv = shlex.split(command)
+    except ValueError:
+        return None
+    if not argv or "/" in argv[0] or shutil.which(argv[0]) is None:
+        return None
+    return argv
+
+
+# run_bash keeps at most this many bytes of stdout, and of stderr
+MAX_BASH_OUTPUT = 64 * 1024
+
+
+def _utf8_cut(data: bytearray, end: int) -> int:
+    """Move a cut point back so it does not split a UTF-8 sequence."""
+    for i in range(end - 1, max(-1, end - 4), -1):
+        byte = data[i]
+        if byte < 0x80:
+            return end
+        if byte >= 0xC0:
+            size = 2 if byte < 0xE0 else 3 if byte < 0xF0 else 4
+            return end if end - i >= size else i
+    return end
+
+
+def _read_capped(stream: IO[bytes], buf: bytearray, limit: int, on_overflow: Callable[[], None]) -> None:
+    """Read a pipe into buf until EOF, or until more than limit bytes arrive."""
+    while True:
+        chunk = stream.read1(65536)
+        if not chunk:
+            return
+        buf += chunk
+        if len(buf) > limit:
+            # Keep the output decodable as UTF-8 after the cut
+            del buf[_utf8_cut(buf, limit):]
+            on_overflow()
+            return
+
+
+def _kill_process(proc: subprocess.Popen) -> None:
+    """Kill a command and, on POSIX, everything it started."""
+    try:
+        if os.name == "nt":
+            proc.kill()
+        else:
+            os.killpg(proc.pid, signal.SIGKILL)
+    except OSError:
+        pass
+
+
+class _BashProcesses:
+    """Processes started for one arun_bash call, so the caller can stop them."""
+    
+    def __init__(self):
+        self.procs: list[subprocess.Popen] = []
+        self.interrupted = False
+    
+    def add(self, proc: subprocess.Popen) -> None:
+        self.procs.append(proc)
+        if self.interrupted:
+            _kill_process(proc)
+    
+    def interrupt(self) -> None:
+        self.interrupted = True
+        for proc in self.procs:
+            _kill_process(proc)
+
+
+# Set by arun_bash; asyncio.to_thread carries it into the worker thread
+_bash_processes: contextvars.ContextVar[Optional[_BashProcesses]] = contextvars.ContextVar(
+    "_bash_processes", default=None
+)
+
+
+def _run_capped(args, shell: bool, cwd: str, timeout: float) -> Tuple[subprocess.CompletedProcess, bool]:
+    """Like ``subprocess.run(capture_output=True)``, but with bounded output.
+    
+    Once stdout or stderr exceeds ``MAX_BASH_OUTPUT`` the command is killed
+    instead of being buffered in full.
+    
+    Returns:
+        (completed process, whether output was truncated)
+    
+    Raises:
+        subprocess.TimeoutExpired: The command ran longer than timeout
+    """
+    proc = subprocess.Popen(
+        args,
+        shell=shell,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        # Own process group, so a kill also reaches the shell's children
+        start_new_session=os.name != "nt",
+    )
+    tracker = _bash_processes.get()
+    if tracker is not None:
+        tracker.add(proc)
+    truncated = threading.Event()
+    
+    def on_overflow():
+        truncated.set()
+        _kill_process(proc)
+    
+    out, err = bytearray(), bytearray()
+    readers = [
+        threading.Thread(target=_read_capped, args=(proc.stdout, out, MAX_BASH_OUTPUT, on_overflow), daemon=True),
+        threading.Thread(target=_read_capped, args=(proc.stderr, err, MAX_BASH_OUTPUT, on_overflow), daemon=True),
+    ]
+    try:
+        for reader in readers:
+            reader.start()
+        deadline = time.monotonic() + timeout
+        for reader in readers:
+            reader.join(max(0.0, deadline - time.monotonic()))
+        if any(reader.is_alive() for reader in readers):
+            raise subprocess.TimeoutExpired(args, timeout)
+        returncode = proc.wait(max(0.0, deadline - time.monotonic()))
+    except BaseException:
+        _kill_process(proc)
+        raise
+    finally:
+        proc.stdout.close()
+        proc.stderr.close()
+    
+    return subprocess.CompletedProcess(args, returncode, bytes(out), bytes(err)), truncated.is_set()
+
+
 def run_bash(command: str, cwd: Optional[str] = None, timeout: int = 60) -> ToolResult:
     """Execute a bash command with sandbox protection.
     
@@ -236,33 +462,40 @@ def run_bash(command: str, cwd: Optional[str] = None, timeout: int = 60) -> Tool
             
         if os.name == "nt":
             normalized = _normalize_windows_command(command)
-            result = subprocess.run(
+            result, truncated = _run_capped(
                 ["powershell", "-NoProfile", "-Command", normalized],
-                capture_output=True,
-                text=False,
+                shell=False,
                 cwd=working_dir,
                 timeout=timeout,
             )
         else:
-            result = subprocess.run(
-                command,
-                shell=True,
-                capture_output=True,
-                text=False,
+            # Simple commands skip the intermediate shell process
+            argv = _direct_argv(command)
+            result, truncated = _run_capped(
+                command if argv is None else argv,
+                shell=argv is None,
                 cwd=working_dir,
                 timeout=timeout,
             )
 
-        stdout_text = _decode_process_output(result.stdout)
+        # Assemble once; large outputs would otherwise be copied by +=
+        parts = [_decode_process_output(result.stdout)]
         stderr_text = _decode_process_output(result.stderr)
-        output = stdout_text
         if stderr_text:
-            output += f"\n[stderr]: {stderr_text}"
+            parts += ("\n[stderr]: ", stderr_text)
+        if truncated:
+            parts.append(
+                f"\n\n[Output truncated at {MAX_BASH_OUTPUT} bytes; command was stopped]\n"
+                f"Correction: Narrow the command (filters, head, -maxdepth) to get less output."
+            )
+        output = "".join(parts)
         
+        # A command stopped for its output size has no meaningful exit code
+        success = truncated or result.returncode == 0
         return ToolResult(
-            success=result.returncode == 0,
+            success=success,
             content=output,
-            error=None if result.returncode == 0 else f"Exit code: {result.returncode}"
+            error=None if success else f"Exit code: {result.returncode}"
         )
     except subprocess.TimeoutExpired:
         return ToolResult(
@@ -288,6 +521,39 @@ def run_bash(command: str, cwd: Optional[str] = None, timeout: int = 60) -> Tool
         )
 
 
+async def aread_file(file_path: str, limit: int = None, offset: int = None) -> ToolResult:
+    """Async read_file, run in a worker thread so the event loop keeps going."""
+    return await asyncio.to_thread(read_file, file_path, limit=limit, offset=offset)
+
+
+async def awrite_file(file_path: str, content: str) -> ToolResult:
+    """Async write_file, run in a worker thread."""
+    return await asyncio.to_thread(write_file, file_path, content)
+
+
+async def aedit_file(file_path: str, old_str: str, new_str: str) -> ToolResult:
+    """Async edit_file, run in a worker thread."""
+    return await asyncio.to_thread(edit_file, file_path, old_str, new_str)
+
+
+async def arun_bash(command: str, cwd: Optional[str] = None, timeout: int = 60) -> ToolResult:
+    """Async run_bash, run in a worker thread.
+    
+    The command runs in its own session, out of reach of the terminal's
+    Ctrl-C, and cancelling the await does not stop the thread. So on
+    interrupt or cancellation the command is killed here.
+    """
+    tracker = _BashProcesses()
+    token = _bash_processes.set(tracker)
+    try:
+        return await asyncio.to_thread(run_bash, command, cwd=cwd, timeout=timeout)
+    except BaseException:
+        tracker.interrupt()
+        raise
+    finally:
+        _bash_processes.reset(token)
+
+
 TOOL_DEFINITIONS = """# Available Tools
 
 You have access to the following tools. When you need to use a tool, output the tool call in JSON format:
@@ -327,7 +593,7 @@ Edit a file by replacing a specific string.
   - old_str (string) - Exact string to search for (must match exactly!)
   - new_str (string) - Replacement string
 - Returns: Success message
-- Note: old_str must match exactly (case-sensitive, including whitespace)
+- Note: old_str must match exactly (case-sensitive, including whitespace) and only once
 - Tip: For multi-line edits, include the surrounding context
 
 ### bash
@@ -1,10 +1,71 @@
 """Tool calling parser and executor for Sun CLI."""
 
+import asyncio
+import inspect
 import json
 import re
-from typing import Optional, Dict, Any, Callable
+from typing import Optional, Dict, Any, Callable, Tuple
 from dataclasses import dataclass
-from . import read_file, write_file, edit_file, run_bash, ToolResult
+from . import (
+    read_file, write_file, edit_file, run_bash,
+    aread_file, awrite_file, aedit_file, arun_bash,
+    ToolResult,
+)
+
+
+# Tool call syntaxes, shared by the per-format patterns and the combined scanner
+_XML_CALL = r'<tool\s+name="(?P<xml_name>[^"]+)">\s*(?P<xml_body>.*?)\s*</tool>'
+_JSON_CALL = r'\{?\s*"tool"\s*:\s*"(?P<json_name>[^"]+)"\s*,\s*"args"\s*:\s*(?P<json_args>\{.*?\})\s*\}?'
+
+# One pass finds both formats, in the order they appear
+_TOOL_CALL_PATTERN = re.compile(f"{_XML_CALL}|{_JSON_CALL}", re.DOTALL)
+
+
+def _may_contain_tool_call(text: str) -> bool:
+    """Cheap substring gate: both call formats contain one of these markers."""
+    return "<tool" in text or '"tool"' in text
+
+
+# Characters a JSON document can start with (json.loads also takes NaN/Infinity)
+_JSON_START_CHARS = frozenset('{["tfn-0123456789NI')
+
+
+def _find_tagged(text: str, tag: str, pos: int = 0) -> Optional[Tuple[int, int, str, str]]:
+    """Find the next ``<tag name="...">body</tag>`` at or after pos.
+    
+    A linear str.find scan equivalent to the XML regexes, without the
+    backtracking of a lazy DOTALL match over large bodies.
+    
+    Returns:
+        (start, end, name, stripped body), or None if there is no match
+    """
+    opener = "<" + tag
+    closer = "</" + tag + ">"
+    size = len(text)
+    while True:
+        start = text.find(opener, pos)
+        if start == -1:
+            return None
+        pos = start + 1
+        
+        # <tag\s+name="NAME">
+        i = j = start + len(opener)
+        while j < size and text[j].isspace():
+            j += 1
+        if j == i or not text.startswith('name="', j):
+            continue
+        name_start = j + 6
+        name_end = text.find('"', name_start)
+        if name_end <= name_start or not text.startswith(">", name_end + 1):
+            continue
+        
+        body_start = name_end + 2
+        body_end = text.find(closer, body_start)
+        if body_end == -1:
+            # No closing tag anywhere after this point
+            return None
+        body = text[body_start:body_end].strip()
+        return start, body_end + len(closer), text[name_start:name_end], body
 
 
 @dataclass
@@ -24,16 +85,13 @@ class ToolCallParser:
     """Parse tool calls from AI response."""
     
     # Pattern for XML-style tool calls
-    XML_PATTERN = re.compile(
-        r'<tool\s+name="([^"]+)">\s*(.*?)\s*</tool>',
-        re.DOTALL
-    )
+    XML_PATTERN = re.compile(_XML_CALL, re.DOTALL)
     
     # Pattern for JSON-style tool calls
-    JSON_PATTERN = re.compile(
-        r'\{?\s*"tool"\s*:\s*"([^"]+)"\s*,\s*"args"\s*:\s*(\{.*?\})\s*\}?',
-        re.DOTALL
-    )
+    JSON_PATTERN = re.compile(_JSON_CALL, re.DOTALL)
+    
+    # Either format
+    TOOL_CALL_PATTERN = _TOOL_CALL_PATTERN
     
     @classmethod
     def parse(cls, text: str) -> list[ToolCall]:
@@ -48,25 +106,28 @@ class ToolCallParser:
         """
         calls = []
         call_index = 0
+        if not _may_contain_tool_call(text):
+            return calls
         
-        # Try XML format first
-        for match in cls.XML_PATTERN.finditer(text):
-            call_index += 1
-            name = match.group(1)
-            args_text = match.group(2)
-            args = cls._parse_args(args_text)
-            calls.append(ToolCall(id=f"toolu_{call_index}", name=name, args=args))
-        
-        # Try JSON format
-        for match in cls.JSON_PATTERN.finditer(text):
+        pos = 0
+        while True:
+            found = _find_tagged(text, "tool", pos)
+            
+            # JSON calls between the previous XML call and this one
+            gap_end = found[0] if found is not None else len(text)
+            for match in cls.JSON_PATTERN.finditer(text, pos, gap_end):
+                call_index += 1
+                try:
+                    args = json.loads(match.group("json_args"))
+                except json.JSONDecodeError:
+                    continue
+                calls.append(ToolCall(id=f"toolu_{call_index}", name=match.group("json_name"), args=args))
+            
+            if found is None:
+                break
+            _, pos, name, body = found
             call_index += 1
-            name = match.group(1)
-            args_text = match.group(2)
-            try:
-                args = json.loads(args_text)
-                calls.append(ToolCall(id=f"toolu_{call_index}", name=name, args=args))
-            except json.JSONDecodeError:
-                continue
+            calls.append(ToolCall(id=f"toolu_{call_index}", name=name, args=cls._parse_args(body)))
         
         return calls
     
@@ -79,16 +140,22 @@ class ToolCallParser:
             <arg name="content">Hello</arg>
         """
         args = {}
-        arg_pattern = re.compile(r'<arg\s+name="([^"]+)">\s*(.*?)\s*</arg>', re.DOTALL)
         
-        for match in arg_pattern.finditer(args_text):
-            name = match.group(1)
-            value = match.group(2).strip()
+        pos = 0
+        while True:
+            found = _find_tagged(args_text, "arg", pos)
+            if found is None:
+                break
+            _, pos, name, value = found
             
-            # Try to parse as JSON for complex types
-            try:
-                args[name] = json.loads(value)
-            except json.JSONDecodeError:
+            # Try to parse as JSON for complex types; plain strings such as
+            # paths and commands skip the decode attempt and its exception
+            if value and value[0] in _JSON_START_CHARS:
+                try:
+                    args[name] = json.loads(value)
+                except json.JSONDecodeError:
+                    args[name] = value
+            else:
                 args[name] = value
         
         return args
@@ -96,7 +163,9 @@ class ToolCallParser:
     @classmethod
     def has_tool_calls(cls, text: str) -> bool:
         """Check if text contains tool calls."""
-        return bool(cls.XML_PATTERN.search(text) or cls.JSON_PATTERN.search(text))
+        if not _may_contain_tool_call(text):
+            return False
+        return _TOOL_CALL_PATTERN.search(text) is not None
 
 
 class ToolExecutor:
@@ -110,9 +179,22 @@ class ToolExecutor:
         "bash": run_bash,
     }
     
+    # Async counterparts used by execute(), so file and shell I/O runs off the event loop
+    ASYNC_NATIVE_TOOLS: dict[str, Callable] = {
+        "read": aread_file,
+        "write": awrite_file,
+        "edit": aedit_file,
+        "bash": arun_bash,
+    }
+    
+    # Side-effect free tools that may run concurrently between ordered calls
+    CONCURRENT_TOOLS = frozenset({"read"})
+    
     def __init__(self):
         """Initialize executor with empty extension handlers."""
         self._handlers: dict[str, Callable] = {}
+        # Names of handlers that are coroutine functions, checked once at registration
+        self._async_handlers: set[str] = set()
         self._context: Any = None
         
     def set_context(self, context: Any):
@@ -127,6 +209,10 @@ class ToolExecutor:
             handler: Function to handle the tool
         """
         self._handlers[name] = handler
+        if inspect.iscoroutinefunction(handler):
+            self._async_handlers.add(name)
+        else:
+            self._async_handlers.discard(name)
         
     async def execute(self, call: ToolCall) -> str:
         """Execute a tool call (async).
@@ -137,15 +223,11 @@ class ToolExecutor:
         Returns:
             Result string
         """
-        import asyncio
-        import inspect
-        
         # Check custom handlers first
-        if call.name in self._handlers:
+        handler = self._handlers.get(call.name)
+        if handler is not None:
             try:
-                handler = self._handlers[call.name]
-                # Check if handler is async
-                if inspect.iscoroutinefunction(handler):
+                if call.name in self._async_handlers:
                     result = await handler(**call.args)
                 else:
                     result = handler(**call.args)
@@ -156,9 +238,10 @@ class ToolExecutor:
                 return f"Error executing {call.name}: {str(e)}\nCorrection: Check tool arguments match the schema and try again."
         
         # Check native tools
-        if call.name in self.NATIVE_TOOLS:
+        tool_func = self.ASYNC_NATIVE_TOOLS.get(call.name)
+        if tool_func is not None:
             try:
-                result = self.NATIVE_TOOLS[call.name](**call.args)
+                result = await tool_func(**call.args)
                 if result.success:
                     return result.content
                 else:
@@ -173,16 +256,50 @@ class ToolExecutor:
             f"Correction: Use an exact tool name from the available list."
         )
     
-    def execute_all(self, calls: list[ToolCall]) -> list[str]:
+    async def execute_all(
+        self,
+        calls: list[ToolCall],
+        on_start: Optional[Callable[[int], None]] = None,
+        on_done: Optional[Callable[[int, str], None]] = None,
+    ) -> list[str]:
         """Execute multiple tool calls.
         
+        Consecutive reads run concurrently; any other call waits for the
+        reads before it and finishes before anything after it starts.
+        
         Args:
             calls: List of ToolCall objects
+            on_start: Called with a call's index when it starts
+            on_done: Called with a call's index and result when it finishes
             
         Returns:
-            List of result strings
+            List of result strings, in the same order as calls
         """
-        return [self.execute(call) for call in calls]
+        results: list[Optional[str]] = [None] * len(calls)
+        batch: list[int] = []
+        
+        async def run(index: int):
+            if on_start is not None:
+                on_start(index)
+            results[index] = await self.execute(calls[index])
+            if on_done is not None:
+                on_done(index, results[index])
+        
+        async def flush():
+            await asyncio.gather(*(run(i) for i in batch))
+            batch.clear()
+        
+        for index, call in enumerate(calls):
+            if call.name in self.CONCURRENT_TOOLS and call.name not in self._handlers:
+                batch.append(index)
+                continue
+            if batch:
+                await flush()
+            await run(index)
+        
+        if batch:
+            await flush()
+        return results
     
     @classmethod
     def execute_native(cls, call: ToolCall) -> str:
@@ -194,9 +311,9 @@ class ToolExecutor:
         Returns:
             Result string
         """
-        tool_func = cls.NATIVE_TOOLS.get(call.name)
-        
-        if not tool_func:
+        try:
+            tool_func = cls.NATIVE_TOOLS[call.name]
+        except KeyError:
             return (
                 f"Error: Unknown tool '{call.name}'. "
                 f"Available: {', '.join(list(cls.NATIVE_TOOLS.keys()))}. "
@@ -0,0 +1,146 @@
+"""Shared HTTP client for one-off LLM requests."""
+
+import asyncio
+import importlib.util
+import json
+from typing import Any, Callable, Optional
+
+import httpx
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+# HTTP/2 needs the optional h2 package (httpx[http2])
+HAS_H2 = importlib.util.find_spec("h2") is not None
+
+# One pooled client so repeated requests reuse the open connection
+_client: Optional[httpx.AsyncClient] = None
+_client_key: Optional[tuple] = None
+
+# Clients replaced after a provider switch: the closes still running, and
+# clients replaced outside an event loop, left for aclose_llm_client()
+_closing: set[asyncio.Task] = set()
+_stale: list[httpx.AsyncClient] = []
+
+
+def json_dumps(obj: Any) -> bytes:
+    """Encode a request body (orjson when available)."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def json_loads(data: str | bytes) -> Any:
+    """Decode a response body or chunk (orjson when available)."""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _retire(client: httpx.AsyncClient) -> None:
+    """Close a replaced client on the running loop, or leave it for shutdown."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        _stale.append(client)
+        return
+    task = loop.create_task(client.aclose())
+    _closing.add(task)
+    task.add_done_callback(_closing.discard)
+
+
+def get_llm_client(config: Any) -> httpx.AsyncClient:
+    """Get the shared client, recreating it if the endpoint or key changed.
+    
+    Args:
+        config: Config with base_url and api_key
+        
+    Returns:
+        An open httpx.AsyncClient for the configured API
+    """
+    global _client, _client_key
+    key = (config.base_url, config.api_key)
+    if _client is None or _client.is_closed or _client_key != key:
+        if _client is not None and not _client.is_closed:
+            _retire(_client)
+        _client = httpx.AsyncClient(
+            base_url=config.base_url,
+            headers={
+                "Authorization": f"Bearer {config.api_key}",
+                "Content-Type": "application/json",
+            },
+            timeout=60.0,
+            http2=HAS_H2,
+            limits=httpx.Limits(max_keepalive_connections=5),
+        )
+        _client_key = key
+    return _client
+
+
+async def aclose_llm_client() -> None:
+    """Close the shared client and any replaced ones.
+    
+    Call from the CLI's shutdown path while the event loop is still running.
+    """
+    global _client, _client_key
+    clients = [*_stale, _client]
+    _stale.clear()
+    _client = _client_key = None
+    for client in clients:
+        if client is not None and not client.is_closed:
+            await client.aclose()
+    if _closing:
+        await asyncio.gather(*_closing, return_exceptions=True)
+
+
+async def stream_chat_completion(
+    client: httpx.AsyncClient,
+    payload: dict[str, Any],
+    on_delta: Optional[Callable[[str], Optional[bool]]] = None,
+) -> str:
+    """Request a chat completion as SSE and return the reply text.
+    
+    Servers that ignore ``stream`` and answer with a plain JSON body are
+    handled too; ``on_delta`` is then never called.
+    
+    Args:
+        client: Client from ``get_llm_client``
+        payload: ``/chat/completions`` request body; ``stream`` is set here
+        on_delta: Called with each piece of text as it arrives; returning
+            True stops reading the rest of the reply
+        
+    Returns:
+        The reply text received
+    """
+    parts: list[str] = []
+    async with client.stream(
+        "POST",
+        "/chat/completions",
+        content=json_dumps({**payload, "stream": True}),
+    ) as response:
+        response.raise_for_status()
+        
+        if not response.headers.get("content-type", "").startswith("text/event-stream"):
+            data = json_loads(await response.aread())
+            return data["choices"][0]["message"]["content"] or ""
+        
+        async for line in response.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+            data = line[6:]
+            if data == "[DONE]":
+                break
+            try:
+                delta = json_loads(data)["choices"][0]["delta"].get("content") or ""
+            except (json.JSONDecodeError, KeyError, IndexError):
+                continue
+            if delta:
+                parts.append(delta)
+                if on_delta is not None and on_delta(delta):
+                    break
+    
+    return "".join(parts)
@@ -0,0 +1,29 @@
+"""Test reading large files through the mmap path of read_file."""
+
+import tempfile
+import time
+from pathlib import Path
+
+from sun_cli.tools import MMAP_READ_THRESHOLD, _read_lines_mapped
+
+
+def test_long_line_with_offset():
+    """Skipping a multi-MB line must stay linear and match read_text."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "long_line.txt"
+        path.write_bytes(b"x" * 40_000_000 + "\r\nsecond\nthird 中文\n".encode("utf-8"))
+        assert path.stat().st_size > MMAP_READ_THRESHOLD
+
+        start = time.perf_counter()
+        content = _read_lines_mapped(path, 1, None)
+        elapsed = time.perf_counter() - start
+
+        expected = "\n".join(path.read_text(encoding="utf-8").splitlines()[1:])
+        assert content == expected == "second\nthird 中文"
+        assert _read_lines_mapped(path, 2, 1) == "third 中文"
+        assert elapsed < 2, f"skipping the long line took {elapsed:.2f}s"
+
+
+if __name__ == "__main__":
+    test_long_line_with_offset()
+    print("\n=== 大文件读取测试完成 ===")